@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Fake Modrinth API server
+A local stand-in for api.modrinth.com, driven by a fixture file, for tests and
+benchmarks without network access. Serves /project, /project/{id}/version,
+/projects, /versions, /version_files, /version_files/update and jar downloads
+with optional latency, bandwidth caps, 429s and failures.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/v2"
+
+# Bytes written per chunk when streaming a jar (and per bandwidth sleep)
+CHUNK_SIZE = 64 * 1024
+
+def jar_bytes(version_id, filename, size):
+    """Deterministic contents for a fixture jar"""
+    seed = f"{version_id}/{filename}:".encode('utf-8')
+    return (seed * (size // len(seed) + 1))[:size]
+
+def generate_fixture(mods=20, dependencies=2, versions=3, jar_size=256 * 1024,
+                     loader="fabric", game_version="1.20.1", seed=0):
+    """Build a synthetic fixture of `mods` projects, each requiring up to
+    `dependencies` shared library projects, with `versions` versions apiece"""
+    rng = random.Random(seed)
+    libraries = max(1, mods // 4) if dependencies else 0
+    projects = []
+    
+    def project(index, slug, requires):
+        project_id = f"P{index:07d}"
+        project_versions = []
+        for number in range(versions):
+            size = max(1024, int(jar_size * rng.uniform(0.25, 1.75)))
+            project_versions.append({
+                'id': f"{project_id}V{number}",
+                'version_number': f"1.{number}.0",
+                'date_published': f"2024-01-{number + 1:02d}T00:00:00Z",
+                'loaders': [loader],
+                'game_versions': [game_version],
+                'dependencies': [
+                    {'project_id': dep_id, 'version_id': None, 'dependency_type': 'required'}
+                    for dep_id in requires
+                ],
+                'files': [{'filename': f"{slug}-1.{number}.0.jar", 'size': size}]
+            })
+        return {
+            'id': project_id,
+            'slug': slug,
+            'title': slug.replace('-', ' ').title(),
+            'description': f"Fixture project {slug}",
+            'loaders': [loader],
+            'game_versions': [game_version],
+            'versions': project_versions
+        }
+    
+    library_ids = [f"P{index:07d}" for index in range(libraries)]
+    for index in range(libraries):
+        projects.append(project(index, f"lib-{index}", []))
+    for index in range(mods):
+        requires = rng.sample(library_ids, min(dependencies, len(library_ids)))
+        projects.append(project(libraries + index, f"mod-{index}", requires))
+    
+    return {'projects': projects}
+
+class FakeModrinth:
+    """Fixture data plus the fault injection settings and counters of one server"""
+    
+    def __init__(self, fixture, latency=0.0, bandwidth=None, rate_limit_every=0,
+                 failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.rate_limit_every = rate_limit_every
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.base_url = None
+        self.reset_stats()
+        
+        self.projects = {}  # id -> project
+        self.slugs = {}  # slug -> id
+        self.versions = {}  # id -> version
+        self.files = {}  # (version id, filename) -> size; contents are regenerated on demand
+        for fixture_project in fixture['projects']:
+            project = {key: value for key, value in fixture_project.items() if key != 'versions'}
+            project['versions'] = []
+            for version in fixture_project['versions']:
+                version = dict(version, project_id=project['id'], files=[
+                    self.add_file(version['id'], file_info, index == 0)
+                    for index, file_info in enumerate(version['files'])
+                ])
+                self.versions[version['id']] = version
+                project['versions'].append(version['id'])
+            self.projects[project['id']] = project
+            self.slugs[project['slug']] = project['id']
+        
+        self.hashes = {'sha1': {}, 'sha512': {}}  # algorithm -> hash -> version id
+        for version in self.versions.values():
+            for file_info in version['files']:
+                for algorithm, digest in file_info['hashes'].items():
+                    self.hashes[algorithm][digest] = version['id']
+    
+    def add_file(self, version_id, file_info, primary):
+        data = jar_bytes(version_id, file_info['filename'], file_info.get('size', 64 * 1024))
+        self.files[(version_id, file_info['filename'])] = len(data)
+        return {
+            'filename': file_info['filename'],
+            'primary': file_info.get('primary', primary),
+            'size': len(data),
+            'hashes': {
+                'sha1': hashlib.sha1(data).hexdigest(),
+                'sha512': hashlib.sha512(data).hexdigest()
+            }
+        }
+    
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {'requests': 0, 'api_requests': 0, 'file_requests': 0,
+                          'bytes_sent': 0, 'rate_limited': 0, 'failed': 0, 'not_modified': 0}
+    
+    def count(self, key, amount=1):
+        """Add to a counter and return its new value"""
+        with self.lock:
+            self.stats[key] += amount
+            return self.stats[key]
+    
+    def project(self, key):
+        return self.projects.get(self.slugs.get(key, key))
+    
+    def version(self, version_id):
+        """A version with download URLs pointing at this server"""
+        version = self.versions[version_id]
+        return dict(version, files=[
+            dict(file_info, url=f"{self.base_url}/files/{version_id}/{file_info['filename']}")
+            for file_info in version['files']
+        ])
+    
+    def project_versions(self, project, loaders=None, game_versions=None):
+        """Newest first, like the real API"""
+        versions = [self.versions[version_id] for version_id in reversed(project['versions'])]
+        if loaders:
+            versions = [v for v in versions if set(v['loaders']) & set(loaders)]
+        if game_versions:
+            versions = [v for v in versions if set(v['game_versions']) & set(game_versions)]
+        return [self.version(v['id']) for v in versions]
+    
+    def inject_fault(self, number):
+        """Status code to fail the number'th request with, or None"""
+        if self.rate_limit_every and number % self.rate_limit_every == 0:
+            self.count('rate_limited')
+            return 429
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            self.count('failed')
+            return 503
+        return None
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle's algorithm
+        # and delayed ACKs add ~40ms to every keep-alive request
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    
+    def log_message(self, *args):
+        pass
+    
+    @property
+    def fake(self):
+        return self.server.fake
+    
+    def send_json(self, body, status=200):
+        data = json.dumps(body).encode('utf-8')
+        etag = '"%s"' % hashlib.sha1(data).hexdigest()
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.fake.count('not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-Ratelimit-Limit', '300')
+        self.send_header('X-Ratelimit-Remaining', '299')
+        self.send_header('X-Ratelimit-Reset', '60')
+        if status == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+        self.fake.count('bytes_sent', len(data))
+    
+    def send_fault(self, status):
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '1')
+            self.send_header('X-Ratelimit-Remaining', '0')
+            self.send_header('X-Ratelimit-Reset', '1')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def begin(self):
+        """Count the request, apply latency and faults; False if the request was answered"""
+        number = self.fake.count('requests')
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        status = self.fake.inject_fault(number)
+        if status:
+            self.send_fault(status)
+            return False
+        return True
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/_stats":
+            with self.fake.lock:
+                stats = dict(self.fake.stats)
+            return self.send_json(stats)
+        if not self.begin():
+            return
+        if url.path.startswith("/files/"):
+            self.fake.count('file_requests')
+            return self.send_file(url.path[len("/files/"):])
+        
+        self.fake.count('api_requests')
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        
+        match = re.fullmatch(r"/project/([^/]+)", path)
+        if match:
+            project = self.fake.project(match.group(1))
+            return self.send_json(project) if project else self.send_json({'error': 'not_found'}, 404)
+        
+        match = re.fullmatch(r"/project/([^/]+)/version", path)
+        if match:
+            project = self.fake.project(match.group(1))
+            if not project:
+                return self.send_json({'error': 'not_found'}, 404)
+            loaders = json.loads(query['loaders'][0]) if 'loaders' in query else None
+            game_versions = json.loads(query['game_versions'][0]) if 'game_versions' in query else None
+            return self.send_json(self.fake.project_versions(project, loaders, game_versions))
+        
+        if path == "/projects":
+            ids = json.loads(query.get('ids', ['[]'])[0])
+            return self.send_json([self.fake.project(key) for key in ids if self.fake.project(key)])
+        
+        if path == "/versions":
+            ids = json.loads(query.get('ids', ['[]'])[0])
+            return self.send_json([self.fake.version(key) for key in ids if key in self.fake.versions])
+        
+        self.send_json({'error': 'not_found'}, 404)
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self.send_json({'error': 'invalid_input'}, 400)
+        if not self.begin():
+            return
+        self.fake.count('api_requests')
+        
+        path = urlparse(self.path).path
+        path = path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path
+        known = self.fake.hashes.get(body.get('algorithm', 'sha1'), {})
+        hashes = [digest for digest in body.get('hashes', []) if digest in known]
+        
+        if path == "/version_files":
+            return self.send_json({digest: self.fake.version(known[digest]) for digest in hashes})
+        
+        if path == "/version_files/update":
+            latest = {}
+            for digest in hashes:
+                project = self.fake.projects[self.fake.versions[known[digest]]['project_id']]
+                versions = self.fake.project_versions(project, body.get('loaders'), body.get('game_versions'))
+                if versions:
+                    latest[digest] = versions[0]
+            return self.send_json(latest)
+        
+        self.send_json({'error': 'not_found'}, 404)
+    
+    def send_file(self, key):
+        version_id, _, filename = key.partition('/')
+        size = self.fake.files.get((version_id, filename))
+        if size is None:
+            return self.send_json({'error': 'not_found'}, 404)
+        data = jar_bytes(version_id, filename, size)
+        
+        etag = '"%s"' % hashlib.sha1(data).hexdigest()
+        start = 0
+        status = 200
+        range_header = self.headers.get('Range', '')
+        match = re.fullmatch(r"bytes=(\d+)-", range_header)
+        if match and self.headers.get('If-Range') in (None, etag):
+            start = int(match.group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{len(data)}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            status = 206
+        
+        body = data[start:]
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/java-archive')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+        
+        for offset in range(0, len(body), CHUNK_SIZE):
+            chunk = body[offset:offset + CHUNK_SIZE]
+            self.wfile.write(chunk)
+            self.fake.count('bytes_sent', len(chunk))
+            if self.fake.bandwidth:
+                time.sleep(len(chunk) / self.fake.bandwidth)
+
+class FakeModrinthServer:
+    """Run a FakeModrinth on a background thread
+    
+    Point an installer at it with ModrinthInstaller(base_url=server.base_url) or
+    `modrinth_installer.py --base-url`.
+    """
+    
+    def __init__(self, fixture=None, host="127.0.0.1", port=0, **options):
+        self.fake = FakeModrinth(fixture or generate_fixture(), **options)
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self.fake
+        self.root_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.base_url = self.root_url + API_PREFIX
+        self.fake.base_url = self.root_url
+        self.thread = None
+    
+    @property
+    def stats(self):
+        with self.fake.lock:
+            return dict(self.fake.stats)
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Modrinth API from a fixture")
+    parser.add_argument("--fixture", help="Fixture JSON file (default: a generated fixture)")
+    parser.add_argument("--mods", type=int, default=20, help="Mods in a generated fixture (default: 20)")
+    parser.add_argument("--jar-kb", type=int, default=256, help="Average jar size in KB of a generated fixture (default: 256)")
+    parser.add_argument("--write-fixture", metavar="PATH", help="Write the fixture in use to a file and exit")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Listen port (default: 8765)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every request")
+    parser.add_argument("--bandwidth-kbps", type=float, help="Per-download bandwidth cap in KB/s")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for generated fixtures and failures")
+    args = parser.parse_args()
+    
+    if args.fixture:
+        with open(args.fixture, encoding='utf-8') as f:
+            fixture = json.load(f)
+    else:
+        fixture = generate_fixture(mods=args.mods, jar_size=args.jar_kb * 1024, seed=args.seed)
+    
+    if args.write_fixture:
+        with open(args.write_fixture, 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, indent=2)
+        return
+    
+    server = FakeModrinthServer(
+        fixture,
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000,
+        bandwidth=args.bandwidth_kbps * 1024 if args.bandwidth_kbps else None,
+        rate_limit_every=args.rate_limit_every,
+        failure_rate=args.failure_rate,
+        seed=args.seed
+    )
+    print(f"Fake Modrinth API on {server.base_url} ({len(server.fake.projects)} projects)")
+    print(f"Run the installer with --base-url {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
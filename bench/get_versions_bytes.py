@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+get_versions transfer benchmark
+Compares the bytes downloaded when listing a project's versions with and
+without server-side loader/game-version filtering
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modrinth_installer import DEFAULT_BASE_URL, ModrinthInstaller
+
+def measure(installer, slug, params):
+    """Fetch one version listing and return (bytes, version count, seconds)"""
+    url = f"{installer.base_url}/project/{slug}/version"
+    started = time.perf_counter()
+    response = installer.session.get(url, params=params)
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return len(response.content), len(response.json()), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure get_versions bytes with and without server-side filtering")
+    parser.add_argument("slugs", nargs="*", default=["fabric-api", "sodium", "lithium"], help="Projects to measure")
+    parser.add_argument("--loader", default="fabric", help="Mod loader (default: fabric)")
+    parser.add_argument("--game-version", default="1.20.1", help="Minecraft version (default: 1.20.1)")
+    parser.add_argument("--base-url", help="API base URL (default: the installer's)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    installer = ModrinthInstaller(base_url=args.base_url or DEFAULT_BASE_URL)
+    
+    filtered_params = installer.version_filter_params(args.loader, args.game_version)
+    rows = []
+    for slug in args.slugs:
+        before = measure(installer, slug, {})
+        after = measure(installer, slug, filtered_params)
+        rows.append({
+            'slug': slug,
+            'unfiltered_bytes': before[0],
+            'unfiltered_versions': before[1],
+            'unfiltered_seconds': round(before[2], 4),
+            'filtered_bytes': after[0],
+            'filtered_versions': after[1],
+            'filtered_seconds': round(after[2], 4),
+        })
+    
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    
+    print(f"{'project':<20} {'before':>12} {'after':>12} {'saved':>8} {'versions':>12}")
+    for row in rows:
+        saved = 1 - row['filtered_bytes'] / row['unfiltered_bytes'] if row['unfiltered_bytes'] else 0
+        print(f"{row['slug']:<20} {row['unfiltered_bytes']:>12,} {row['filtered_bytes']:>12,} {saved:>7.1%} "
+              f"{row['unfiltered_versions']:>5} -> {row['filtered_versions']:<4}")
+    total_before = sum(row['unfiltered_bytes'] for row in rows)
+    total_after = sum(row['filtered_bytes'] for row in rows)
+    print(f"{'total':<20} {total_before:>12,} {total_after:>12,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Install pipeline benchmarks
+Runs get_versions, dependency resolution, download_file and end-to-end installs
+against bench/fake_modrinth.py with fixed generated fixtures, reporting wall
+time, request count, bytes transferred and peak RSS. Results are written as
+JSON so runs from different commits can be compared with --compare.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from fake_modrinth import FakeModrinthServer, generate_fixture
+
+LOADER = "fabric"
+GAME_VERSION = "1.20.1"
+
+# Fixed fixtures: (mods, dependencies per mod, versions per project, average jar size)
+FIXTURES = {
+    'small': dict(mods=1, dependencies=0, versions=3, jar_size=128 * 1024),
+    'fabric-20': dict(mods=20, dependencies=2, versions=5, jar_size=512 * 1024),
+    'kitchen-sink-200': dict(mods=200, dependencies=3, versions=5, jar_size=256 * 1024),
+}
+
+BENCHMARKS = ('get_versions', 'resolve_dependencies', 'download_file', 'install_mod')
+
+def mod_slugs(fixture):
+    return [project['slug'] for project in fixture['projects'] if project['slug'].startswith('mod-')]
+
+def server_stats(stats_url):
+    with urllib.request.urlopen(stats_url) as response:
+        return json.load(response)
+
+def run_benchmark(name, base_url, stats_url, slugs, concurrency):
+    """Run one benchmark in this process and return its measurements
+    
+    Requests and bytes are read from the fake server around the timed part only.
+    """
+    from modrinth_installer import ModrinthInstaller, DownloadScheduler
+    
+    installer = ModrinthInstaller(base_url=base_url)
+    download_dir = tempfile.mkdtemp(prefix="modwing-bench-")
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Resolution is set-up work for the download benchmark, not part of its timing
+        if name == 'download_file':
+            targets, dependencies, _ = installer.resolve_mods(slugs, LOADER, GAME_VERSION)
+            files = [installer.get_primary_file(entry['version_data'])
+                     for entry in list(targets.values()) + list(dependencies.values())]
+        
+        before = server_stats(stats_url)
+        started = time.perf_counter()
+        if name == 'get_versions':
+            for slug in slugs:
+                installer.get_versions(slug, LOADER, GAME_VERSION)
+        elif name == 'resolve_dependencies':
+            installer.resolve_mods(slugs, LOADER, GAME_VERSION)
+        elif name == 'download_file':
+            DownloadScheduler(installer, concurrency).run(files, download_dir)
+        elif name == 'install_mod':
+            if len(slugs) == 1:
+                installer.install_mod(slugs[0], LOADER, GAME_VERSION, download_dir)
+            else:
+                installer.install_mods(slugs, LOADER, GAME_VERSION, download_dir, concurrency=concurrency)
+        seconds = time.perf_counter() - started
+        after = server_stats(stats_url)
+    
+    return {
+        'seconds': seconds,
+        'requests': after['requests'] - before['requests'],
+        'bytes': after['bytes_sent'] - before['bytes_sent'],
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == 'darwin' else 1),
+        'memo': installer.memo.stats()
+    }
+
+def child(queue, *args):
+    queue.put(run_benchmark(*args))
+
+def measure(name, server, slugs, concurrency):
+    """Run a benchmark in a fresh process so peak RSS and caches are its own"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=child, args=(
+        queue, name, server.base_url, f"{server.root_url}/_stats", slugs, concurrency
+    ))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    """Print each result next to the matching one from an earlier run"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(row['fixture'], row['benchmark']): row for row in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'fixture':<18} {'benchmark':<22} {'seconds':>18} {'requests':>16} {'peak RSS':>18}")
+    for row in results:
+        old = baseline.get((row['fixture'], row['benchmark']))
+        if not old:
+            continue
+        change = (row['seconds'] - old['seconds']) / old['seconds'] * 100 if old['seconds'] else 0.0
+        print(f"{row['fixture']:<18} {row['benchmark']:<22} "
+              f"{old['seconds']:>7.3f} → {row['seconds']:<7.3f} "
+              f"{old['requests']:>6} → {row['requests']:<6} "
+              f"{old['peak_rss_kb']:>7} → {row['peak_rss_kb']:<7} ({change:+.1f}% time)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the install pipeline against a local fake Modrinth")
+    parser.add_argument("--fixture", action="append", choices=list(FIXTURES),
+                        help="Fixture to run (repeatable; default: all)")
+    parser.add_argument("--benchmark", action="append", choices=BENCHMARKS,
+                        help="Benchmark to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the median is reported (default: 3)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Download concurrency (default: 8)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latency added by the fake server (default: 0)")
+    parser.add_argument("--bandwidth-kbps", type=float, help="Per-download bandwidth cap of the fake server")
+    parser.add_argument("--output", help="Results file (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    
+    results = []
+    for fixture_name in args.fixture or list(FIXTURES):
+        fixture = generate_fixture(loader=LOADER, game_version=GAME_VERSION, **FIXTURES[fixture_name])
+        slugs = mod_slugs(fixture)
+        with FakeModrinthServer(
+            fixture,
+            latency=args.latency_ms / 1000,
+            bandwidth=args.bandwidth_kbps * 1024 if args.bandwidth_kbps else None
+        ) as server:
+            for name in args.benchmark or BENCHMARKS:
+                runs = [measure(name, server, slugs, args.concurrency) for _ in range(args.repeat)]
+                row = {
+                    'fixture': fixture_name,
+                    'benchmark': name,
+                    'mods': len(slugs),
+                    'seconds': round(statistics.median(run['seconds'] for run in runs), 4),
+                    'runs': [round(run['seconds'], 4) for run in runs],
+                    'requests': runs[-1]['requests'],
+                    'bytes': runs[-1]['bytes'],
+                    'peak_rss_kb': max(run['peak_rss_kb'] for run in runs),
+                    'memo': runs[-1]['memo']
+                }
+                results.append(row)
+                print(f"{fixture_name:<18} {name:<22} {row['seconds']:>8.3f}s {row['requests']:>6} req "
+                      f"{row['bytes'] / (1024 * 1024):>8.1f} MB {row['peak_rss_kb'] / 1024:>7.1f} MB RSS")
+    
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'repeat': args.repeat,
+            'concurrency': args.concurrency,
+            'latency_ms': args.latency_ms,
+            'bandwidth_kbps': args.bandwidth_kbps
+        },
+        'results': results
+    }
+    output = Path(args.output) if args.output else BENCH_DIR / "results" / f"{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"\nWrote {output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,969 @@ Downloads mods and their dependencies from Modrinth API
 """
 
 import requests
+import asyncio
+import functools
 import json
 import os
+import random
+import re
 import argparse
+import hashlib
+import shutil
+import tempfile
+import time
 from pathlib import Path
 from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import sys
+import threading
+import contextlib
+
+# Modrinth API root; override with --base-url to target a mirror or bench/fake_modrinth.py
+DEFAULT_BASE_URL = "https://api.modrinth.com/v2"
+
+# Maximum ids per bulk /projects or /versions request
+BULK_CHUNK_SIZE = 100
+
+# Newest versions of a dependency fetched in bulk before falling back to a full listing
+RECENT_VERSION_WINDOW = 8
+
+# Dependencies of one level whose versions are looked up at once when the prefetched ones don't fit
+DEPENDENCY_CONCURRENCY = 8
+
+# Default size cap for the on-disk metadata cache
+DEFAULT_CACHE_SIZE = 100 * 1024 * 1024
+
+# Default size cap for the content-addressable jar store
+DEFAULT_STORE_SIZE = 2 * 1024 * 1024 * 1024
+
+# Linux ioctl that clones a file's extents (reflink) on btrfs/xfs
+FICLONE = 0x40049409
+
+# Concurrent downloads, and how many of them may share one host
+DOWNLOAD_CONCURRENCY = 8
+PER_HOST_CONNECTIONS = 6
+
+# Seconds an in-process memo entry is trusted before the API is asked again
+MEMO_TTL = 600
+
+# Prometheus histogram buckets: seconds, bytes per second and dependency levels
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+THROUGHPUT_BUCKETS = tuple(2 ** power for power in range(16, 29, 2))
+DEPTH_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15)
+
+# Read size when hashing jars already on disk
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Format version written to and accepted from lockfiles
+LOCKFILE_VERSION = 1
+
+# Minimum seconds between download_progress events for one file
+PROGRESS_INTERVAL = 0.25
+
+# Published file hashes checked while a download streams
+VERIFIED_HASHES = ('sha1', 'sha512')
+
+# Attempts per download before giving up, and (connect, read) timeouts per attempt
+DOWNLOAD_ATTEMPTS = 5
+DOWNLOAD_TIMEOUT = (10, 60)
+
+# HTTP statuses worth retrying
+RETRYABLE_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+# API request attempts, (connect, read) timeouts and the longest single wait between them
+API_ATTEMPTS = 5
+API_TIMEOUT = (10, 30)
+MAX_RETRY_DELAY = 60.0
+
+# Connection/read error retries done by urllib3 underneath every request
+TRANSPORT_RETRIES = 3
+
+# Pause for the rate limit window to reset once this few requests remain
+RATE_LIMIT_LOW_WATER = 5
+
+class InstallCancelled(Exception):
+    """Raised inside an installer call whose request has been cancelled"""
+
+
+class OfflineMiss(requests.exceptions.RequestException):
+    """Raised in offline mode for a request that can't be answered locally"""
+
+
+class Memo:
+    """In-process memo of API lookups, with hit/miss counters for benchmarking
+    
+    Entries expire after ttl seconds so a long-lived --serve worker still picks
+    up new releases.
+    """
+    
+    def __init__(self, ttl=MEMO_TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Memoized value for key, or None (counted as a miss)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+    
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+    
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+class Profiler:
+    """Per-phase timing spans and per-request counters for --profile"""
+    
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.spans = []
+        self.requests = {}  # endpoint -> counters
+    
+    def reset(self):
+        """Start over, e.g. between requests of a long-running worker"""
+        with self.lock:
+            self.started = time.perf_counter()
+            self.spans = []
+            self.requests = {}
+    
+    def record_span(self, record):
+        """Span observer keeping every finished span"""
+        span = {key: value for key, value in record.items() if key != 'started'}
+        span['start'] = round(record['started'] - self.started, 6)
+        span['seconds'] = round(record['seconds'], 6)
+        with self.lock:
+            self.spans.append(span)
+    
+    def record_response(self, response, *args, **kwargs):
+        """requests response hook counting every HTTP exchange by endpoint"""
+        endpoint = f"{response.request.method} {endpoint_name(response.url, self.base_url)}"
+        length = response.headers.get('Content-Length')
+        with self.lock:
+            counters = self.requests.setdefault(endpoint, {'count': 0, 'seconds': 0.0, 'bytes': 0, 'statuses': {}})
+            counters['count'] += 1
+            # elapsed stops at the response headers, so for downloads it is the time to first byte
+            counters['seconds'] += response.elapsed.total_seconds()
+            counters['bytes'] += int(length) if length and length.isdigit() else 0
+            status = str(response.status_code)
+            counters['statuses'][status] = counters['statuses'].get(status, 0) + 1
+    
+    def report(self):
+        """Machine-readable profile: phase totals, request counters and every span"""
+        with self.lock:
+            spans = list(self.spans)
+            requests_by_endpoint = {endpoint: dict(counters, statuses=dict(counters['statuses']))
+                                    for endpoint, counters in self.requests.items()}
+        
+        phases = {}
+        for span in spans:
+            phase = phases.setdefault(span['phase'], {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            phase['count'] += 1
+            phase['seconds'] = round(phase['seconds'] + span['seconds'], 6)
+            phase['max_seconds'] = max(phase['max_seconds'], span['seconds'])
+        
+        return {
+            'wall_seconds': round(time.perf_counter() - self.started, 6),
+            'phases': phases,
+            'requests': requests_by_endpoint,
+            'downloads': [span for span in spans if span['phase'] == 'download'],
+            'spans': sorted(spans, key=lambda span: span['start'])
+        }
+    
+    def print_table(self):
+        report = self.report()
+        print(f"\n⏱️  Profile ({report['wall_seconds']:.2f}s wall)")
+        print(f"  {'phase':<14} {'count':>6} {'total s':>9} {'max s':>8}")
+        for phase, totals in report['phases'].items():
+            print(f"  {phase:<14} {totals['count']:>6} {totals['seconds']:>9.3f} {totals['max_seconds']:>8.3f}")
+        
+        print(f"  {'request':<40} {'count':>6} {'wait s':>8} {'bytes':>12}  statuses")
+        for endpoint, counters in sorted(report['requests'].items()):
+            statuses = ' '.join(f"{status}×{count}" for status, count in sorted(counters['statuses'].items()))
+            print(f"  {endpoint:<40} {counters['count']:>6} {counters['seconds']:>8.3f} "
+                  f"{counters['bytes']:>12,}  {statuses}")
+        
+        downloads = sorted(report['downloads'], key=lambda span: span['seconds'], reverse=True)
+        if downloads:
+            print(f"  {'slowest downloads':<40} {'ttfb s':>8} {'total s':>8} {'write s':>8} {'MB/s':>7}")
+            for span in downloads[:5]:
+                print(f"  {span['name']:<40} {span.get('ttfb', 0):>8.3f} {span['seconds']:>8.3f} "
+                      f"{span.get('write_seconds', 0):>8.3f} {span.get('mb_per_second', 0):>7.1f}")
+
+
+class Tracer:
+    """No-op tracer; subclasses receive every finished span in export()
+    
+    Span records carry trace_id, span_id and parent_id (None for a root span)
+    besides the phase, name, fields, 'started' (perf_counter) and 'seconds' of
+    ModrinthInstaller.span. Install one with ModrinthInstaller.set_tracer.
+    """
+    
+    def export(self, record):
+        pass
+    
+    def close(self):
+        pass
+
+
+class JSONFileTracer(Tracer):
+    """Writes spans to a file, OpenTelemetry style, one JSON line per finished trace
+    
+    Spans are held only until the root span of their trace ends, so a long-running
+    worker appends each request's trace as it completes instead of keeping them all.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pending = {}  # trace_id -> finished spans waiting for their root
+        self.written = 0
+        # Converts perf_counter readings to wall clock time
+        self.clock_offset = time.time() - time.perf_counter()
+        try:
+            open(self.path, 'w', encoding='utf-8').close()
+        except OSError as e:
+            print(f"Warning: could not write trace: {e}")
+    
+    def export(self, record):
+        start = record['started'] + self.clock_offset
+        attributes = {key: value for key, value in record.items()
+                      if value is not None
+                      and key not in ('phase', 'trace_id', 'span_id', 'parent_id', 'started', 'seconds')}
+        span = {
+            'trace_id': record['trace_id'],
+            'span_id': record['span_id'],
+            'parent_span_id': record['parent_id'],
+            'name': record['phase'],
+            'start_time_unix_nano': int(start * 1e9),
+            'end_time_unix_nano': int((start + record['seconds']) * 1e9),
+            'attributes': attributes
+        }
+        with self.lock:
+            spans = self.pending.setdefault(record['trace_id'], [])
+            spans.append(span)
+            if record['parent_id'] is None:
+                self.write(self.pending.pop(record['trace_id']))
+    
+    def write(self, spans):
+        """Append one trace; called with the lock held"""
+        spans = sorted(spans, key=lambda span: span['start_time_unix_nano'])
+        line = {'service': 'modwing-installer', 'trace_id': spans[0]['trace_id'], 'spans': spans}
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(line) + "\n")
+        except OSError as e:
+            print(f"Warning: could not write trace: {e}")
+            return
+        self.written += len(spans)
+    
+    def close(self):
+        """Write spans of traces whose root never finished"""
+        with self.lock:
+            for spans in self.pending.values():
+                self.write(spans)
+            self.pending.clear()
+            written = self.written
+        print(f"🧵 {written} span(s) written to {self.path}")
+
+
+class Metrics:
+    """Prometheus metrics for a long-running installer, in the text exposition format
+    
+    API counters come from a session response hook, download counters and timings
+    from installer spans, so no call site records anything itself. Exposed over HTTP
+    with serve() and/or written to a node_exporter textfile with flush().
+    """
+    
+    HELP = {
+        'modwing_api_requests_total': ('counter', "API requests by endpoint and status"),
+        'modwing_api_request_duration_seconds': ('histogram', "Time to response headers of API requests"),
+        'modwing_cache_requests_total': ('counter', "Metadata cache revalidations (hit = 304) and misses"),
+        'modwing_memo_lookups_total': ('counter', "In-process memo lookups by result"),
+        'modwing_downloaded_bytes_total': ('counter', "Bytes received for jar downloads"),
+        'modwing_downloads_total': ('counter', "Jar downloads by source (download or store) and result"),
+        'modwing_download_throughput_bytes_per_second': ('histogram', "Throughput of each jar download"),
+        'modwing_resolution_depth': ('histogram', "Dependency levels walked per resolution"),
+        'modwing_resolution_duration_seconds': ('histogram', "Time to resolve a set of mods"),
+        'modwing_install_duration_seconds': ('histogram', "Time to install a set of mods, by result"),
+        'modwing_rate_limit_waits_total': ('counter', "Pauses for the API rate limit or a retry by kind"),
+        'modwing_rate_limit_wait_seconds_total': ('counter', "Seconds spent waiting on the rate limit or retries"),
+    }
+    
+    def __init__(self, base_url, memo=None, textfile=None, cached=False):
+        self.base_url = base_url
+        self.memo = memo
+        self.cached = cached  # whether GETs go through the metadata cache, so a 200 is a miss
+        self.textfile = textfile
+        self.lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+        self.buckets = {}  # name -> bucket bounds
+        self.httpd = None
+    
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def observe(self, name, value, buckets=DURATION_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.buckets[name] = buckets
+            histogram = self.histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+    
+    def record_response(self, response, *args, **kwargs):
+        """requests response hook"""
+        endpoint = endpoint_name(response.url, self.base_url)
+        if endpoint.startswith('download '):
+            return  # counted from the download span, which knows the bytes actually received
+        
+        self.inc('modwing_api_requests_total', endpoint=endpoint, status=str(response.status_code))
+        self.observe('modwing_api_request_duration_seconds', response.elapsed.total_seconds(), endpoint=endpoint)
+        if self.cached and response.request.method == 'GET':
+            if response.status_code == 304:
+                self.inc('modwing_cache_requests_total', result='hit')
+            elif response.status_code == 200:
+                self.inc('modwing_cache_requests_total', result='miss')
+    
+    def record_span(self, record):
+        """Span observer"""
+        phase = record['phase']
+        if phase == 'download':
+            source = record.get('source')
+            self.inc('modwing_downloads_total', source=source or 'none', result='ok' if source else 'failed')
+            if record.get('bytes'):
+                self.inc('modwing_downloaded_bytes_total', record['bytes'])
+            if source == 'download' and record['seconds'] > 0:
+                self.observe('modwing_download_throughput_bytes_per_second',
+                             record.get('bytes', 0) / record['seconds'], THROUGHPUT_BUCKETS)
+        elif phase == 'resolve':
+            self.observe('modwing_resolution_depth', record.get('depth', 0), DEPTH_BUCKETS)
+            self.observe('modwing_resolution_duration_seconds', record['seconds'])
+        elif phase == 'install':
+            self.observe('modwing_install_duration_seconds', record['seconds'],
+                         result='ok' if record.get('success') else 'failed')
+        elif phase in ('rate_limit_wait', 'retry_wait'):
+            self.inc('modwing_rate_limit_waits_total', kind=phase)
+            self.inc('modwing_rate_limit_wait_seconds_total', record['seconds'], kind=phase)
+    
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        
+        def label_text(labels, extra=()):
+            labels = tuple(labels) + tuple(extra)
+            if not labels:
+                return ''
+            return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels) + '}'
+        
+        lines = []
+        with self.lock:
+            if self.memo:
+                memo = self.memo.stats()
+                self.counters[('modwing_memo_lookups_total', (('result', 'hit'),))] = memo['hits']
+                self.counters[('modwing_memo_lookups_total', (('result', 'miss'),))] = memo['misses']
+            for name, (kind, help_text) in self.HELP.items():
+                counters = [(labels, value) for (metric, labels), value in self.counters.items() if metric == name]
+                histograms = [(labels, data) for (metric, labels), data in self.histograms.items() if metric == name]
+                if not counters and not histograms:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(counters):
+                    lines.append(f"{name}{label_text(labels)} {value}")
+                for labels, (bucket_counts, total, count) in sorted(histograms):
+                    for bound, bucket_count in zip(self.buckets[name], bucket_counts):
+                        lines.append(f"{name}_bucket{label_text(labels, [('le', bound)])} {bucket_count}")
+                    lines.append(f"{name}_bucket{label_text(labels, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{label_text(labels)} {total}")
+                    lines.append(f"{name}_count{label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+    
+    def flush(self):
+        """Write the textfile, if one is configured, atomically"""
+        if not self.textfile:
+            return
+        path = Path(self.textfile)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write metrics textfile: {e}")
+    
+    def serve(self, port, host="127.0.0.1"):
+        """Expose /metrics over HTTP on a background thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"📈 Metrics on http://{host}:{self.httpd.server_address[1]}/metrics")
+
+
+class LRUFileStore:
+    """Directory of files kept under a size cap by evicting the least recently used
+    
+    Subclasses refresh a file's mtime whenever it is read, so mtime order is
+    recency order.
+    """
+    
+    def __init__(self, directory, max_bytes, pattern):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.pattern = pattern
+        self.size = None  # bytes on disk, computed on first write
+        self.lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def touch(self, path):
+        """Mark a file as recently used"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    
+    def record_write(self, delta):
+        """Account for bytes added (or removed) and evict if over the cap"""
+        with self.lock:
+            if self.size is None:
+                self.size = self.disk_usage()
+            else:
+                self.size += delta
+            if self.size > self.max_bytes:
+                self.evict()
+    
+    def disk_usage(self):
+        return sum(path.stat().st_size for path in self.directory.glob(self.pattern))
+    
+    def evict(self):
+        """Drop least recently used files until the store is under 90% of its cap"""
+        entries = []
+        for path in self.directory.glob(self.pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        
+        self.size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self.size <= target:
+                break
+            try:
+                path.unlink()
+                self.size -= size
+            except OSError:
+                pass
+
+class MetadataCache(LRUFileStore):
+    """Disk-backed cache of API responses and their HTTP validators
+    
+    Each entry is one JSON file named by a hash of the request URL and holding
+    the body plus its ETag/Last-Modified.
+    """
+    
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        super().__init__(directory, max_bytes, '*/*.json')
+    
+    def path_for(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.directory / key[:2] / f"{key}.json"
+    
+    def get(self, url):
+        """Return the cached entry for url, or None"""
+        path = self.path_for(url)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.touch(path)
+        return entry
+    
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store a response body with its validators"""
+        path = self.path_for(url)
+        data = json.dumps({
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time(),
+            'body': body
+        }).encode('utf-8')
+        
+        try:
+            path.parent.mkdir(exist_ok=True)
+            old_size = path.stat().st_size if path.exists() else 0
+            
+            # Write to a temp file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write metadata cache entry: {e}")
+            return
+        
+        self.record_write(len(data) - old_size)
+
+class SlugIndex:
+    """Bidirectional slug <-> project id index, persisted next to the metadata cache
+    
+    Lets lookups by slug go straight to id-keyed URLs, so each project is
+    fetched and cached under one key however it was named.
+    """
+    
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.ids = {}  # slug -> project id
+        self.slugs = {}  # project id -> slug
+        self.lock = threading.Lock()
+        self.dirty = False
+        
+        if self.path:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self.ids = json.load(f)
+            except (OSError, ValueError):
+                self.ids = {}
+            self.slugs = {project_id: slug for slug, project_id in self.ids.items()}
+    
+    def id_for(self, key):
+        """Project id for a slug or id; unknown keys are returned unchanged"""
+        with self.lock:
+            return self.ids.get(key, key)
+    
+    def slug_for(self, project_id):
+        with self.lock:
+            return self.slugs.get(project_id)
+    
+    def add(self, slug, project_id):
+        with self.lock:
+            if self.ids.get(slug) == project_id and self.slugs.get(project_id) == slug:
+                return
+            # A renamed project drops its old slug
+            old_slug = self.slugs.get(project_id)
+            if old_slug and old_slug != slug:
+                self.ids.pop(old_slug, None)
+            self.ids[slug] = project_id
+            self.slugs[project_id] = slug
+            self.dirty = True
+    
+    def save(self):
+        """Write the index atomically if anything changed"""
+        with self.lock:
+            if not self.path or not self.dirty:
+                return
+            data = json.dumps(self.ids, sort_keys=True)
+            self.dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: could not write slug index: {e}")
+
+class JarStore(LRUFileStore):
+    """Content-addressable store of mod jars keyed by their sha512
+    
+    Files only enter the store after their content has been hashed, so a hit can
+    be linked straight into a mods directory without re-downloading or re-hashing.
+    """
+    
+    def __init__(self, directory, max_bytes=DEFAULT_STORE_SIZE):
+        super().__init__(directory, max_bytes, '*/*.jar')
+    
+    def path_for(self, sha512):
+        return self.directory / sha512[:2] / f"{sha512}.jar"
+    
+    def has(self, sha512):
+        return self.path_for(sha512).is_file()
+    
+    def add(self, sha512, source):
+        """Link (or copy) an already verified file into the store"""
+        path = self.path_for(sha512)
+        if path.is_file():
+            self.touch(path)
+            return
+        try:
+            path.parent.mkdir(exist_ok=True)
+            place_file(source, path)
+        except OSError as e:
+            print(f"Warning: could not add {Path(source).name} to the jar store: {e}")
+            return
+        self.record_write(path.stat().st_size)
+    
+    def link_into(self, sha512, target):
+        """Place a stored jar at target; returns False if it is not in the store"""
+        path = self.path_for(sha512)
+        try:
+            place_file(path, target)
+        except OSError:
+            return False
+        self.touch(path)
+        return True
+
+def place_file(source, target):
+    """Put source's content at target via hardlink, then reflink, then a plain copy"""
+    source, target = Path(source), Path(target)
+    tmp_target = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        try:
+            os.link(source, tmp_target)
+        except OSError:
+            copy_file(source, tmp_target)
+        os.replace(tmp_target, target)
+    finally:
+        tmp_target.unlink(missing_ok=True)
+
+def copy_file(source, target):
+    """Copy a file, sharing its blocks (reflink) where the filesystem supports it"""
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        if sys.platform.startswith('linux'):
+            try:
+                import fcntl
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except (ImportError, OSError):
+                pass
+        shutil.copyfileobj(src, dst)
+
+class PartialDownload:
+    """A .part file being downloaded, with what is needed to resume it
+    
+    Tracks the bytes written so far, running digests over them and the response
+    validator for If-Range. The validator is kept in a small .meta sidecar so a
+    .part left behind by a failed run can be resumed by the next one.
+    """
+    
+    def __init__(self, path, url, algorithms):
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(f"{self.path.name}.meta")
+        self.url = url
+        self.filename = self.path.stem  # target name without .part
+        self.algorithms = algorithms
+        self.validator = None
+        self.resumed = False  # whether some of the data came from a Range request
+        self.reset_digests()
+        self.offset = 0
+        self.load()
+    
+    def reset_digests(self):
+        self.digests = {algorithm: hashlib.new(algorithm) for algorithm in self.algorithms}
+    
+    def load(self):
+        """Pick up a .part from an earlier run if it belongs to the same URL"""
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            size = self.path.stat().st_size
+        except (OSError, ValueError):
+            self.reset()
+            return
+        
+        if meta.get('url') != self.url or not meta.get('validator') or not size:
+            self.reset()
+            return
+        
+        # Hash the bytes we already have once; new chunks extend the same digests
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                self.update(chunk)
+        self.validator = meta['validator']
+    
+    def set_validator(self, etag, last_modified):
+        """Remember the strongest validator the server sent for If-Range"""
+        validator = etag if etag and not etag.startswith('W/') else last_modified
+        if validator and validator != self.validator:
+            self.validator = validator
+            try:
+                with open(self.meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({'url': self.url, 'validator': validator}, f)
+            except OSError:
+                pass
+    
+    def update(self, chunk):
+        self.offset += len(chunk)
+        for digest in self.digests.values():
+            digest.update(chunk)
+    
+    def reset(self):
+        """Forget any partial data and start from byte zero"""
+        self.offset = 0
+        self.validator = None
+        self.resumed = False
+        self.reset_digests()
+        self.path.unlink(missing_ok=True)
+        self.meta_path.unlink(missing_ok=True)
+    
+    def discard(self):
+        self.path.unlink(missing_ok=True)
+        self.meta_path.unlink(missing_ok=True)
+    
+    def finish(self, target):
+        """Atomically move the completed download into place"""
+        os.replace(self.path, target)
+        self.meta_path.unlink(missing_ok=True)
+
+def hash_file(path, algorithms=VERIFIED_HASHES):
+    """Hash a file in one streamed pass, returning {algorithm: hexdigest}"""
+    digests = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            for digest in digests.values():
+                digest.update(chunk)
+    return {algorithm: digest.hexdigest() for algorithm, digest in digests.items()}
+
+def hash_files(paths, algorithms=VERIFIED_HASHES, workers=None):
+    """Hash many files in parallel, returning {path: {algorithm: hexdigest}}
+    
+    hashlib releases the GIL while digesting large buffers, so a thread pool
+    spreads the work across cores.
+    """
+    paths = list(paths)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        digests = executor.map(lambda path: hash_file(path, algorithms), paths)
+        return dict(zip(paths, digests))
+
+def find_jars(directory):
+    """Jars directly inside a mods directory, sorted by name"""
+    directory = Path(directory)
+    return sorted(directory.glob('*.jar')) if directory.is_dir() else []
+
+def endpoint_name(url, base_url):
+    """Group a request URL by API endpoint (ids elided), or by host for downloads"""
+    if not url.startswith(base_url):
+        return f"download {urlparse(url).netloc}"
+    path = urlparse(url).path[len(urlparse(base_url).path):]
+    path = re.sub(r"^/(project|version)/[^/]+", r"/\1/{id}", path)
+    return path or "/"
+
+def retry_after_delay(response):
+    """Seconds to wait according to a Retry-After header, or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Exponential backoff with jitter for the given (zero-based) retry attempt"""
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+class DependencyGraph:
+    """Resolved projects and every dependency edge between them
+    
+    Nodes are the chosen version of each project, keyed by project id. Edges keep
+    their Modrinth dependency_type (required, optional, incompatible, embedded),
+    including edges to projects that are not part of the install. An edge's 'to'
+    is None when it only names a version of an unknown project.
+    """
+    
+    DOT_EDGE_STYLES = {
+        'required': 'style=solid',
+        'optional': 'style=dashed',
+        'incompatible': 'style=bold, color=red',
+        'embedded': 'style=dotted',
+    }
+    
+    def __init__(self):
+        self.nodes = {}  # project_id -> node
+        self.edges = []
+    
+    def add_node(self, entry, requested=False):
+        project = entry['project_info']
+        version = entry['version_data']
+        self.nodes.setdefault(project['id'], {
+            'project_id': project['id'],
+            'slug': project['slug'],
+            'title': project['title'],
+            'version_id': version['id'],
+            'version_number': version['version_number'],
+            'requested': requested
+        })
+    
+    def add_edge(self, source, target, dependency_type, version_id=None):
+        self.edges.append({'from': source, 'to': target, 'type': dependency_type, 'version_id': version_id})
+    
+    def conflicts(self):
+        """Incompatible pairs and pinned dependencies that the chosen versions don't satisfy
+        
+        A version conflict is two dependents pinning different versions of a project,
+        or a pin that resolution could not honour (e.g. the pinned version doesn't fit
+        the loader, or the project was already chosen at another version).
+        Returns a list of {'type': 'incompatible', 'project_id', 'with'} and
+        {'type': 'version', 'project_id', 'version_id', 'required': {version_id: [dependents]}}.
+        """
+        conflicts = []
+        incompatible = set()
+        pinned = {}  # project_id -> {version_id: [dependent project ids]}
+        for edge in self.edges:
+            node = self.nodes.get(edge['to'])
+            if not node or edge['to'] == edge['from']:
+                continue
+            if edge['type'] == 'incompatible' and edge['version_id'] in (None, node['version_id']):
+                pair = frozenset((edge['from'], edge['to']))
+                if pair not in incompatible:
+                    incompatible.add(pair)
+                    conflicts.append({'type': 'incompatible', 'project_id': edge['from'], 'with': edge['to']})
+            elif edge['type'] == 'required' and edge['version_id']:
+                pinned.setdefault(edge['to'], {}).setdefault(edge['version_id'], []).append(edge['from'])
+        
+        for project_id, required in pinned.items():
+            if set(required) != {self.nodes[project_id]['version_id']}:
+                conflicts.append({
+                    'type': 'version',
+                    'project_id': project_id,
+                    'version_id': self.nodes[project_id]['version_id'],
+                    'required': required
+                })
+        return conflicts
+    
+    def to_json(self):
+        return {'nodes': list(self.nodes.values()), 'edges': self.edges, 'conflicts': self.conflicts()}
+    
+    def to_dot(self):
+        """Graphviz source; requested mods are bold, projects outside the install dashed"""
+        def quote(text):
+            return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        
+        lines = ["digraph dependencies {", "    rankdir=LR;", "    node [shape=box];"]
+        for node in self.nodes.values():
+            style = ', style=bold' if node['requested'] else ''
+            label = f"{node['title']}\n{node['version_number']}"
+            lines.append(f"    {quote(node['project_id'])} [label={quote(label)}{style}];")
+        
+        external = {edge['to'] or edge['version_id'] for edge in self.edges} - set(self.nodes)
+        for name in sorted(external):
+            lines.append(f"    {quote(name)} [style=dashed];")
+        
+        for edge in self.edges:
+            style = self.DOT_EDGE_STYLES.get(edge['type'], 'style=solid')
+            lines.append(f"    {quote(edge['from'])} -> {quote(edge['to'] or edge['version_id'])} "
+                         f"[label={quote(edge['type'])}, {style}];")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+class DownloadScheduler:
+    """Run an installer's downloads concurrently with per-host connection limits
+    
+    Jobs are started largest first so one big jar doesn't finish alone at the
+    end, and aggregate throughput is reported once everything is done.
+    """
+    
+    def __init__(self, installer, concurrency=DOWNLOAD_CONCURRENCY, per_host=PER_HOST_CONNECTIONS):
+        self.installer = installer
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.host_slots = {}
+        self.host_lock = threading.Lock()
+        
+        # urllib3 pools connections per host, so one host must be able to use every slot
+        if min(self.concurrency, self.per_host) > 10:
+            installer.mount_adapter(min(self.concurrency, self.per_host))
+    
+    def host_slot(self, url):
+        """Semaphore bounding concurrent connections to url's host"""
+        host = urlparse(url).netloc
+        with self.host_lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self.host_slots[host]
+    
+    def run(self, jobs, download_dir):
+        """Download jobs, each a file dict with url, filename, hashes and size
+        
+        Returns a list of True/False in the same order as jobs.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        order = sorted(range(len(jobs)), key=lambda index: jobs[index].get('size') or 0, reverse=True)
+        
+        # Worker threads act on behalf of the calling request
+        @self.installer.bind_thread_context
+        def download(job):
+            self.installer.check_cancelled()
+            with self.host_slot(job['url']):
+                return self.installer.download_file(job['url'], job['filename'], download_dir, job.get('hashes'))
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(jobs))) as executor:
+            futures = {index: executor.submit(download, jobs[index]) for index in order}
+            outcomes = [futures[index].result() for index in range(len(jobs))]
+        elapsed = max(time.monotonic() - started, 1e-6)
+        
+        total_bytes = sum(
+            (Path(download_dir) / job['filename']).stat().st_size
+            for job, ok in zip(jobs, outcomes) if ok
+        )
+        print(f"\n📊 {sum(outcomes)}/{len(jobs)} file(s), {total_bytes / (1024 * 1024):.1f} MB in "
+              f"{elapsed:.1f}s ({total_bytes / (1024 * 1024) / elapsed:.1f} MB/s)")
+        self.installer.emit('download_stats', files=len(jobs), succeeded=sum(outcomes),
+                            bytes=total_bytes, seconds=round(elapsed, 3))
+        return outcomes
+
 
 class ModrinthInstaller:
-    def __init__(self, api_key=None):
-        self.base_url = "https://api.modrinth.com/v2"
+    def __init__(self, api_key=None, cache_dir=None, cache_size=DEFAULT_CACHE_SIZE,
+                 store_dir=None, store_size=DEFAULT_STORE_SIZE, offline=False, base_url=DEFAULT_BASE_URL):
+        self.base_url = base_url.rstrip("/")
         self.headers = {"User-Agent": "ModrinthInstaller/1.0"}
         
         # Use provided API key or None (Modrinth API works without auth for most operations)
@@ -23,225 +976,2125 @@ class ModrinthInstaller:
         
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        self.mount_adapter()
         
-    def get_project_info(self, slug):
-        """Get basic project information"""
+        # Rate limit budget reported by the API, shared by every thread
+        self.rate_limit_lock = threading.Lock()
+        self.rate_limit_remaining = None
+        self.rate_limit_reset_at = 0.0
+        self.rate_limit_announced = None
+        
+        # Optional on-disk cache of API responses, revalidated with ETag/Last-Modified;
+        # like any other cache write, failing to create it only costs a warning
+        self.cache = None
+        if cache_dir:
+            try:
+                self.cache = MetadataCache(Path(cache_dir) / "metadata", cache_size)
+            except OSError as e:
+                print(f"Warning: metadata cache disabled, could not create {cache_dir}: {e}")
+        
+        # Projects and versions already fetched by this process
+        self.memo = Memo()
+        
+        # Slug <-> id index, persisted with the metadata cache when there is one
+        self.slug_index = SlugIndex(Path(cache_dir) / "slugs.json" if self.cache else None)
+        
+        # Optional content-addressable jar store shared by every install
+        self.store = None
+        if store_dir:
+            try:
+                self.store = JarStore(store_dir, store_size)
+            except OSError as e:
+                print(f"Warning: jar store disabled, could not create {store_dir}: {e}")
+        
+        # Offline mode answers only from the cache and jar store, listing what it couldn't find
+        self.offline = offline
+        self.offline_missing = []
+        self.offline_lock = threading.Lock()
+        self.offline_miss_count = 0  # every miss, to tell whether one install ran into any
+        
+        # Metadata lookups that failed, so a sync can tell its resolution was incomplete
+        self.lookup_failure_lock = threading.Lock()
+        self.lookup_failure_count = 0
+        
+        # Callables receiving every finished span (see span); profiling, metrics and tracing add theirs
+        self.span_observers = []
+        self.profiler = None
+        self.metrics = None
+        self.tracer = Tracer()
+        
+        # Per-thread cancel event, set while serving a cancellable request
+        self._local = threading.local()
+        
+        # Callable receiving structured progress events (see emit); None disables them
+        self.event_sink = None
+    
+    def set_cancel_event(self, event):
+        """Make installer calls on this thread abort once the event is set"""
+        self._local.cancel_event = event
+    
+    def set_event_sink(self, sink):
+        """Send events raised on this thread to sink instead of the installer-wide one"""
+        self._local.event_sink = sink
+    
+    def emit(self, event, **fields):
+        """Report a machine-readable progress event, e.g. for --events ndjson"""
+        sink = getattr(self._local, 'event_sink', None) or self.event_sink
+        if sink:
+            sink({'event': event, **fields})
+    
+    def enable_profiling(self):
+        """Record per-phase spans and per-request counters (see Profiler)"""
+        self.profiler = Profiler(self.base_url)
+        self.session.hooks['response'].append(self.profiler.record_response)
+        self.span_observers.append(self.profiler.record_span)
+        return self.profiler
+    
+    def enable_metrics(self, textfile=None):
+        """Keep Prometheus metrics from responses and spans (see Metrics)"""
+        self.metrics = Metrics(self.base_url, self.memo, textfile, cached=self.cache is not None)
+        self.session.hooks['response'].append(self.metrics.record_response)
+        self.span_observers.append(self.metrics.record_span)
+        return self.metrics
+    
+    def set_tracer(self, tracer):
+        """Export every span, with trace and parent ids, to tracer (see Tracer)"""
+        if self.tracer.export in self.span_observers:
+            self.span_observers.remove(self.tracer.export)
+        self.tracer = tracer
+        self.span_observers.append(tracer.export)
+        return tracer
+    
+    def span(self, phase, name=None, **fields):
+        """Time a block as a span for the span observers; a no-op context without any
+        
+        The yielded dict can be given extra fields to report. Spans opened inside
+        another on the same thread (or a worker given its thread_context) are its children.
+        """
+        if not self.span_observers:
+            return contextlib.nullcontext({})
+        return self.observed_span(phase, name, fields)
+    
+    @contextlib.contextmanager
+    def observed_span(self, phase, name, fields):
+        parent = getattr(self._local, 'span', None)  # (trace_id, span_id) of the enclosing span
+        record = {
+            'phase': phase,
+            'name': name,
+            **fields,
+            'trace_id': parent[0] if parent else os.urandom(16).hex(),
+            'span_id': os.urandom(8).hex(),
+            'parent_id': parent[1] if parent else None
+        }
+        self._local.span = (record['trace_id'], record['span_id'])
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._local.span = parent
+            record['started'] = started
+            record['seconds'] = time.perf_counter() - started
+            for observer in self.span_observers:
+                observer(record)
+    
+    def thread_context(self):
+        """This thread's cancel event, event sink and open span, to hand on to worker threads"""
+        return (getattr(self._local, 'cancel_event', None), getattr(self._local, 'event_sink', None),
+                getattr(self._local, 'span', None))
+    
+    def set_span_context(self, span):
+        """Make spans opened on this thread children of span, as given by thread_context"""
+        self._local.span = span
+    
+    def bind_thread_context(self, func):
+        """Wrap func to run on a worker thread with this thread's cancel event, event sink and span"""
+        cancel_event, event_sink, span = self.thread_context()
+        
+        def bound(*args, **kwargs):
+            previous = self.thread_context()
+            self.set_cancel_event(cancel_event)
+            self.set_event_sink(event_sink)
+            self.set_span_context(span)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.set_cancel_event(previous[0])
+                self.set_event_sink(previous[1])
+                self.set_span_context(previous[2])
+        
+        return bound
+    
+    def check_cancelled(self):
+        """Raise InstallCancelled if the current thread's request was cancelled"""
+        event = getattr(self._local, 'cancel_event', None)
+        if event is not None and event.is_set():
+            raise InstallCancelled()
+        
+    def offline_miss(self, what):
+        """Record something offline mode could not find locally and return the error to raise"""
+        with self.offline_lock:
+            self.offline_miss_count += 1
+            if what not in self.offline_missing:
+                self.offline_missing.append(what)
+        return OfflineMiss(f"{what} is not available offline")
+    
+    def lookup_failed(self):
+        """Count a project, version or bulk lookup that failed"""
+        with self.lookup_failure_lock:
+            self.lookup_failure_count += 1
+    
+    def print_offline_missing(self):
+        """List everything an offline run needed but couldn't find locally"""
+        print(f"\n📴 Offline: {len(self.offline_missing)} item(s) missing from the local cache and jar store:")
+        for what in self.offline_missing:
+            print(f"  - {what}")
+        self.emit('offline_missing', missing=list(self.offline_missing))
+    
+    def install_succeeded(self, results, offline_misses):
+        """Every result succeeded and offline mode missed nothing since offline_miss_count was offline_misses"""
+        if self.offline_miss_count != offline_misses:
+            print("📴 Some metadata or files were not available offline; the install is incomplete")
+            return False
+        return all(results.values())
+    
+    def mount_adapter(self, pool_size=10):
+        """Mount a connection pool that retries transport failures on the session
+        
+        The urllib3 Retry only covers connection and read errors; HTTP status
+        retries (429/5xx) are handled by request() so they can honour the
+        API's rate limit headers.
+        """
+        retry = Retry(
+            total=TRANSPORT_RETRIES,
+            connect=TRANSPORT_RETRIES,
+            read=TRANSPORT_RETRIES,
+            status=0,
+            backoff_factor=0.5,
+            allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+            raise_on_status=False
+        )
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def request(self, method, url, **kwargs):
+        """Send an API request, pacing on the rate limit and retrying 429/5xx
+        
+        Waits for the rate limit window to reset when the remaining budget is
+        nearly spent, and retries retryable statuses after Retry-After (or the
+        rate limit reset for 429) or a jittered exponential backoff. Returns the
+        final response; callers still call raise_for_status().
+        """
+        if self.offline:
+            raise self.offline_miss(f"{method} {url}")
+        
+        kwargs.setdefault('timeout', API_TIMEOUT)
+        for attempt in range(API_ATTEMPTS):
+            self.check_cancelled()
+            self.wait_for_rate_limit()
+            
+            response = self.session.request(method, url, **kwargs)
+            self.record_rate_limit(response)
+            
+            if response.status_code not in RETRYABLE_STATUSES or attempt == API_ATTEMPTS - 1:
+                return response
+            
+            delay = retry_after_delay(response)
+            if delay is None and response.status_code == 429:
+                with self.rate_limit_lock:
+                    delay = max(0.0, self.rate_limit_reset_at - time.time()) or None
+            if delay is None:
+                delay = backoff_delay(attempt)
+            delay = min(delay, MAX_RETRY_DELAY)
+            
+            print(f"    ⏳ {response.status_code} from {urlparse(url).path}, retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 2}/{API_ATTEMPTS})")
+            response.close()
+            with self.span('retry_wait', urlparse(url).path, status=response.status_code):
+                time.sleep(delay)
+        return response
+    
+    def record_rate_limit(self, response):
+        """Remember the rate limit budget from X-Ratelimit-* headers"""
+        remaining = response.headers.get('X-Ratelimit-Remaining')
+        reset = response.headers.get('X-Ratelimit-Reset')
+        if remaining is None or reset is None:
+            return
         try:
-            response = self.session.get(f"{self.base_url}/project/{slug}")
+            remaining, reset = int(remaining), float(reset)
+        except ValueError:
+            return
+        with self.rate_limit_lock:
+            self.rate_limit_remaining = remaining
+            self.rate_limit_reset_at = time.time() + reset
+    
+    def wait_for_rate_limit(self):
+        """Sleep until the window resets if the remaining budget is nearly spent
+        
+        Every thread waits for the same reset time; the budget is only forgotten
+        once that time has passed.
+        """
+        with self.rate_limit_lock:
+            if self.rate_limit_remaining is None or self.rate_limit_remaining > RATE_LIMIT_LOW_WATER:
+                return
+            delay = self.rate_limit_reset_at - time.time()
+            if delay <= 0:
+                self.rate_limit_remaining = None
+                return
+            # Announce each window once, however many threads wait it out
+            announce = self.rate_limit_announced != self.rate_limit_reset_at
+            self.rate_limit_announced = self.rate_limit_reset_at
+        
+        delay = min(delay, MAX_RETRY_DELAY)
+        if announce:
+            print(f"    ⏳ Rate limit nearly exhausted, pausing {delay:.1f}s")
+        with self.span('rate_limit_wait'):
+            time.sleep(delay)
+    
+    def get_json(self, url, params=None):
+        """GET a JSON API resource, revalidating against the metadata cache if enabled
+        
+        Offline, cached bodies are returned as they are and anything else is missing.
+        """
+        if self.offline:
+            full_url = requests.Request('GET', url, params=params).prepare().url
+            entry = self.cache.get(full_url) if self.cache else None
+            if entry:
+                return entry['body']
+            raise self.offline_miss(f"metadata {full_url}")
+        
+        if not self.cache:
+            response = self.request('GET', url, params=params)
             response.raise_for_status()
             return response.json()
+        
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        entry = self.cache.get(full_url)
+        
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = self.request('GET', full_url, headers=headers)
+        if response.status_code == 304 and entry:
+            return entry['body']
+        response.raise_for_status()
+        
+        body = response.json()
+        self.cache.put(full_url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return body
+    
+    def post_json(self, url, payload):
+        """POST a JSON body to the API and return the decoded response"""
+        response = self.request('POST', url, json=payload)
+        response.raise_for_status()
+        return response.json()
+    
+    def get_versions_by_hash(self, hashes, algorithm='sha512'):
+        """Look up the versions that published files with these hashes (bulk /version_files)
+        
+        Returns {hash: version} for the hashes Modrinth knows.
+        """
+        hashes = list(dict.fromkeys(hashes))
+        if not hashes:
+            return {}
+        try:
+            return self.post_json(f"{self.base_url}/version_files", {'hashes': hashes, 'algorithm': algorithm})
+        except requests.exceptions.RequestException as e:
+            print(f"Error looking up file hashes: {e}")
+            return {}
+    
+    def get_latest_versions_by_hash(self, hashes, loader, game_version, algorithm='sha512'):
+        """Newest compatible version for each file hash (bulk /version_files/update)
+        
+        Returns {hash: version} for the hashes Modrinth knows and has a version for.
+        """
+        hashes = list(dict.fromkeys(hashes))
+        if not hashes:
+            return {}
+        payload = {
+            'hashes': hashes,
+            'algorithm': algorithm,
+            'loaders': [loader],
+            'game_versions': [game_version]
+        }
+        try:
+            return self.post_json(f"{self.base_url}/version_files/update", payload)
+        except requests.exceptions.RequestException as e:
+            print(f"Error checking for updates: {e}")
+            return {}
+    
+    def identify_files(self, paths, workers=None):
+        """Identify jars by content hash with one bulk /version_files lookup
+        
+        Returns {path: {'sha1', 'sha512', 'size', 'version'}} in the order given,
+        where 'version' is the Modrinth version that published the file or None.
+        """
+        paths = list(paths)
+        with self.span('hash', None, files=len(paths)):
+            digests = hash_files(paths, workers=workers)
+        known_versions = self.get_versions_by_hash(d['sha512'] for d in digests.values())
+        return {
+            str(path): {
+                'sha1': d['sha1'],
+                'sha512': d['sha512'],
+                'size': Path(path).stat().st_size,
+                'version': known_versions.get(d['sha512'])
+            }
+            for path, d in digests.items()
+        }
+    
+    def get_project_info(self, slug):
+        """Get basic project information"""
+        project_id = self.slug_index.id_for(slug)
+        project = self.memo.get(('project', project_id))
+        if project is not None:
+            return project
+        url = self.item_url(project_id, 'project')
+        try:
+            with self.span('project', slug):
+                project = self.get_json(url)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching project info for {slug}: {e}")
+            self.lookup_failed()
             return None
+        id_url = self.item_url(project['id'], 'project')
+        if url != id_url and self.cache and not self.offline:
+            # Later runs ask by id, so cache a project fetched by slug under its id URL too,
+            # with the same validators since it is the same resource
+            entry = self.cache.get(url)
+            if entry:
+                self.cache.put(id_url, entry['body'], entry.get('etag'), entry.get('last_modified'))
+        self.remember_project(project)
+        self.slug_index.save()
+        return project
+    
+    def remember_project(self, project):
+        """Memoize a project under its id and record its slug in the index"""
+        self.memo.put(('project', project['id']), project)
+        self.slug_index.add(project['slug'], project['id'])
     
     def get_versions(self, slug, loader=None, game_version=None):
-        """Get versions for a project with optional filtering"""
+        """Get versions for a project (by slug or id) with optional filtering
+        
+        Slugs in the slug index are requested by id, without a project fetch.
+        """
+        project_id = self.slug_index.id_for(slug)
+        key = ('versions', project_id, loader, game_version)
+        versions = self.memo.get(key)
+        if versions is not None:
+            return versions
         try:
-            url = f"{self.base_url}/project/{slug}/version"
-            response = self.session.get(url)
-            response.raise_for_status()
-            versions = response.json()
+            url = f"{self.base_url}/project/{project_id}/version"
+            with self.span('versions', slug):
+                versions = self.get_json(url, self.version_filter_params(loader, game_version))
             
-            # Filter versions if criteria provided
+            # The API already filtered; re-check locally as a safety net
             if loader or game_version:
-                filtered_versions = []
-                for version in versions:
-                    loader_match = not loader or loader in version.get('loaders', [])
-                    game_match = not game_version or game_version in version.get('game_versions', [])
-                    if loader_match and game_match:
-                        filtered_versions.append(version)
-                return filtered_versions
-            
-            return versions
+                versions = [v for v in versions if self.is_compatible(v, loader, game_version)]
         except requests.exceptions.RequestException as e:
             print(f"Error fetching versions for {slug}: {e}")
+            self.lookup_failed()
             return []
+        self.memo.put(key, versions)
+        for version in versions:
+            self.memo.put(('version', version['id']), version)
+        return versions
+    
+    def version_filter_params(self, loader=None, game_version=None):
+        """Query parameters that make the API filter versions server-side"""
+        params = {}
+        if loader:
+            params['loaders'] = json.dumps([loader])
+        if game_version:
+            params['game_versions'] = json.dumps([game_version])
+        return params
+    
+    def get_projects(self, ids):
+        """Get several projects in as few bulk requests as possible"""
+        return self.get_bulk("projects", ids, 'project')
+    
+    def get_versions_by_id(self, ids):
+        """Get several versions by id in as few bulk requests as possible"""
+        return self.get_bulk("versions", ids, 'version')
+    
+    def get_bulk(self, endpoint, ids, kind):
+        """Fetch /projects or /versions for a list of ids, chunked to keep URLs short
+        
+        Ids already memoized as kind are answered from the memo and not requested.
+        """
+        items = []
+        missing = []
+        for item_id in dict.fromkeys(ids):
+            item = self.memo.get((kind, item_id))
+            if item is not None:
+                items.append(item)
+            else:
+                missing.append(item_id)
+        
+        for start in range(0, len(missing), BULK_CHUNK_SIZE):
+            chunk = missing[start:start + BULK_CHUNK_SIZE]
+            try:
+                with self.span('bulk', endpoint, ids=len(chunk)):
+                    if self.offline:
+                        fetched = self.get_bulk_offline(endpoint, chunk, kind)
+                    else:
+                        fetched = self.get_json(f"{self.base_url}/{endpoint}", {'ids': json.dumps(chunk)})
+                        self.cache_items(fetched, kind)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching {endpoint} in bulk: {e}")
+                self.lookup_failed()
+                continue
+            for item in fetched:
+                if kind == 'project':
+                    self.remember_project(item)
+                else:
+                    self.memo.put((kind, item['id']), item)
+            items.extend(fetched)
+        
+        if kind == 'project':
+            self.slug_index.save()
+        return items
+    
+    def item_url(self, item_id, kind):
+        """URL of a single project or version"""
+        return f"{self.base_url}/{kind}/{item_id}"
+    
+    def cache_items(self, items, kind):
+        """Also cache each project or version of a bulk response under its own URL
+        
+        Bulk responses are cached under their exact id list, which a later run
+        rarely repeats; per-id entries let offline mode answer any subset. Entries
+        that already carry validators are left alone so revalidation keeps working.
+        """
+        if not self.cache:
+            return
+        for item in items:
+            url = self.item_url(item['id'], kind)
+            entry = self.cache.get(url)
+            if not entry or not (entry.get('etag') or entry.get('last_modified')):
+                self.cache.put(url, item)
+    
+    def get_bulk_offline(self, endpoint, ids, kind):
+        """Answer a bulk lookup from the cache: the same id list if cached, otherwise id by id"""
+        entry = self.cache.get(requests.Request(
+            'GET', f"{self.base_url}/{endpoint}", params={'ids': json.dumps(ids)}
+        ).prepare().url) if self.cache else None
+        if entry:
+            return entry['body']
+        
+        items = []
+        for item_id in ids:
+            try:
+                items.append(self.get_json(self.item_url(item_id, kind)))
+            except OfflineMiss:
+                pass
+        return items
+    
+    def is_compatible(self, version, loader=None, game_version=None):
+        """Check a version against the target loader and game version"""
+        loader_match = not loader or loader in version.get('loaders', [])
+        game_match = not game_version or game_version in version.get('game_versions', [])
+        return loader_match and game_match
+    
+    def resolve_dependencies(self, version_data, loader, game_version, resolved=None):
+        """Resolve all required dependencies breadth first, one bulk lookup per level"""
+        if resolved is None:
+            resolved = {}
+        return self.resolve_dependency_levels([version_data], loader, game_version, resolved)
+    
+    def resolve_dependency_levels(self, frontier, loader, game_version, resolved, span=None):
+        """Resolve the required dependencies of every version in frontier, breadth first
+        
+        If span (a span record) is given, the number of levels walked is stored as 'depth'.
+        """
+        depth = 0
+        while frontier:
+            self.check_cancelled()
+            depth += 1
+            with self.span('resolve_level', None, depth=depth, frontier=len(frontier)):
+                level = self.fetch_dependency_level(frontier, resolved)
+                
+                # Dependencies whose prefetched versions don't fit each need a version listing;
+                # look them up side by side so a level costs one round trip, not one per dependency
+                @self.bind_thread_context
+                def select(item):
+                    self.check_cancelled()
+                    dep, project_info, candidates = item
+                    return self.select_dependency_version(dep, project_info, candidates, loader, game_version)
+                
+                if len(level) > 1:
+                    with ThreadPoolExecutor(max_workers=min(DEPENDENCY_CONCURRENCY, len(level))) as executor:
+                        dep_entries = list(executor.map(select, level.values()))
+                else:
+                    dep_entries = [select(item) for item in level.values()]
+                
+                frontier = []
+                for project_id, dep_entry in zip(level, dep_entries):
+                    if dep_entry:
+                        resolved[project_id] = dep_entry
+                        frontier.append(dep_entry['version_data'])
+        
+        if span is not None:
+            span['depth'] = depth
+        return resolved
+    
+    def fetch_dependency_level(self, frontier, resolved):
+        """Bulk-fetch the projects and candidate versions of the next dependency level
+        
+        Collects the unresolved required dependencies of every version in frontier
+        and fetches them with one /projects and one /versions request. When several
+        dependents name the same project, a pinned version wins over an unpinned one,
+        so the result does not depend on the order mods were listed in. Returns
+        {project_id: (dep, project_info, candidate_versions)}.
+        """
+        by_key = {}
+        for version_data in frontier:
+            for dep in version_data.get('dependencies', []):
+                if dep['dependency_type'] != 'required':
+                    continue
+                key = dep.get('project_id') or dep.get('version_id')
+                if not key or key in resolved:
+                    continue
+                if key not in by_key or (dep.get('version_id') and not by_key[key].get('version_id')):
+                    by_key[key] = dep
+        deps = list(by_key.values())
+        
+        if not deps:
+            return {}
+        
+        project_ids = [dep['project_id'] for dep in deps if dep.get('project_id')]
+        projects = {p['id']: p for p in self.get_projects(project_ids)} if project_ids else {}
+        
+        # Pinned versions, plus the newest few versions of each unpinned project
+        # (a project's version ids are listed oldest first)
+        version_ids = []
+        for dep in deps:
+            if dep.get('version_id'):
+                version_ids.append(dep['version_id'])
+            elif dep['project_id'] in projects:
+                version_ids.extend(projects[dep['project_id']].get('versions', [])[-RECENT_VERSION_WINDOW:])
+        versions = {v['id']: v for v in self.get_versions_by_id(version_ids)} if version_ids else {}
+        
+        # Dependencies that only name a version learn their project from it
+        orphan_ids = [
+            versions[dep['version_id']]['project_id'] for dep in deps
+            if not dep.get('project_id') and dep.get('version_id') in versions
+        ]
+        orphan_ids = [project_id for project_id in orphan_ids if project_id not in projects]
+        if orphan_ids:
+            projects.update({p['id']: p for p in self.get_projects(orphan_ids)})
+        
+        level = {}
+        for dep in deps:
+            if dep.get('project_id'):
+                project_id = dep['project_id']
+            elif dep['version_id'] in versions:
+                project_id = versions[dep['version_id']]['project_id']
+            else:
+                continue
+            
+            if project_id in resolved or project_id not in projects:
+                continue
+            if project_id in level and (level[project_id][0].get('version_id') or not dep.get('version_id')):
+                continue
+            
+            if dep.get('version_id'):
+                candidate_ids = [dep['version_id']]
+            else:
+                candidate_ids = projects[project_id].get('versions', [])[-RECENT_VERSION_WINDOW:]
+            candidates = [versions[version_id] for version_id in candidate_ids if version_id in versions]
+            level[project_id] = (dep, projects[project_id], candidates)
+        
+        return level
+    
+    def select_dependency_version(self, dep, project_info, candidates, loader, game_version):
+        """Pick the version to install for one dependency
+        
+        Uses the newest compatible prefetched candidate (the pinned version, if any)
+        and only lists the project's versions when none fits. Returns
+        {'project_info', 'version_data'} or None if nothing is compatible.
+        """
+        print(f"  Found dependency: {project_info['title']} ({project_info['slug']})")
+        self.emit('dependency_found', project_id=project_info['id'], slug=project_info['slug'],
+                  title=project_info['title'])
+        
+        compatible = sorted(
+            (v for v in candidates if self.is_compatible(v, loader, game_version)),
+            key=lambda v: v.get('date_published', ''),
+            reverse=True
+        )
+        if compatible:
+            return {
+                'project_info': project_info,
+                'version_data': compatible[0]
+            }
+        
+        # Pinned version is incompatible or the project's recent versions don't fit;
+        # skip the full listing when the project as a whole can't match
+        if 'loaders' in project_info and 'game_versions' in project_info \
+                and not self.is_compatible(project_info, loader, game_version):
+            dep_versions = []
+        else:
+            dep_versions = self.get_versions(project_info['id'], loader, game_version)
+        if not dep_versions:
+            print(f"    Warning: No compatible versions found for {project_info['slug']}")
+            self.emit('dependency_unresolved', project_id=project_info['id'], slug=project_info['slug'])
+            return None
+        
+        return {
+            'project_info': project_info,
+            'version_data': dep_versions[0]  # Latest compatible version
+        }
     
-    def resolve_dependencies(self, version_data, loader, game_version, resolved=None):
-        """Recursively resolve all dependencies"""
-        if resolved is None:
-            resolved = {}
+    def download_file(self, url, filename, download_dir, hashes=None):
+        """Download a file from URL, verifying it against its published hashes
         
-        for dep in version_data.get('dependencies', []):
-            if dep['dependency_type'] != 'required':
-                continue
-                
-            project_id = dep['project_id']
-            if project_id in resolved:
-                continue
-                
-            # Get project info
-            project_info = self.get_project_info(project_id)
-            if not project_info:
-                continue
-                
-            print(f"  Found dependency: {project_info['title']} ({project_info['slug']})")
+        Data is streamed into a .part file while sha1/sha512 are computed on the
+        same chunks; the file is renamed into place only if every known hash
+        matches and is deleted otherwise. Dropped transfers are retried with
+        backoff and resumed with a Range request, and a .part left by an earlier
+        failed run is resumed too; if a resumed file fails verification it is
+        downloaded once more from byte zero. Jars already in the jar store are
+        linked instead of downloaded.
+        """
+        with self.span('download', filename) as record:
+            filepath = Path(download_dir) / filename
+            hashes = hashes or {}
+            sha512 = hashes.get('sha512')
             
-            # Get compatible version
-            dep_versions = self.get_versions(project_info['slug'], loader, game_version)
-            if not dep_versions:
-                print(f"    Warning: No compatible versions found for {project_info['slug']}")
-                continue
+            if self.store and sha512 and self.store.has(sha512):
+                if self.store.link_into(sha512, filepath):
+                    record['source'] = 'store'
+                    print(f"    ✓ {filename} reused from jar store")
+                    self.emit('file_complete', filename=filename, path=str(filepath.resolve()),
+                              size=filepath.stat().st_size, sha512=sha512, source='store')
+                    return True
+            
+            if self.offline:
+                print(f"    ✗ {filename} is not in the jar store (offline)")
+                self.offline_miss(f"jar {filename}" + (f" (sha512 {sha512})" if sha512 else ""))
+                self.emit('download_failed', filename=filename, error='not in the jar store (offline)')
+                return False
+            
+            # sha512 is always computed so it can be reported; published hashes are verified
+            algorithms = [algorithm for algorithm in VERIFIED_HASHES if hashes.get(algorithm) or algorithm == 'sha512']
+            partial = PartialDownload(filepath.with_name(f"{filename}.part"), url, algorithms)
+            started = time.perf_counter()
+            
+            for from_scratch in (False, True):
+                if not self.fetch_with_retries(partial, filename, record):
+                    return False
                 
-            # Use specific version if specified, otherwise use latest
-            if dep.get('version_id'):
-                dep_version = next((v for v in dep_versions if v['id'] == dep['version_id']), None)
-                if not dep_version:
-                    dep_version = dep_versions[0]  # Fallback to latest
-            else:
-                dep_version = dep_versions[0]  # Latest version
+                verified = [algorithm for algorithm in partial.digests if hashes.get(algorithm)]
+                mismatched = [
+                    algorithm for algorithm in verified
+                    if partial.digests[algorithm].hexdigest() != hashes[algorithm].lower()
+                ]
+                if not mismatched:
+                    break
+                if partial.resumed and not from_scratch:
+                    # The kept bytes may not belong to this file; one clean download decides
+                    print(f"    ↻ {filename} failed {'/'.join(mismatched)} verification after resuming, "
+                          f"downloading again from byte 0")
+                    partial.reset()
+                    continue
+                partial.discard()
+                print(f"    ✗ {filename} failed {'/'.join(mismatched)} verification, discarded")
+                self.emit('download_failed', filename=filename, error=f"{'/'.join(mismatched)} mismatch")
+                return False
             
-            resolved[project_id] = {
-                'project_info': project_info,
-                'version_data': dep_version
-            }
+            partial.finish(filepath)
+            record['source'] = 'download'
+            elapsed = time.perf_counter() - started
+            record['mb_per_second'] = round(record.get('bytes', 0) / (1024 * 1024) / elapsed, 3) if elapsed else 0.0
+            print(f"    ✓ Downloaded to {filepath}{' (verified)' if verified else ''}")
+            self.emit('file_complete', filename=filename, path=str(filepath.resolve()), size=partial.offset,
+                      sha512=partial.digests['sha512'].hexdigest(), source='download')
             
-            # Recursively resolve dependencies
-            self.resolve_dependencies(dep_version, loader, game_version, resolved)
+            # Only verified content is shared with later installs
+            if self.store and 'sha512' in verified:
+                self.store.add(sha512, filepath)
+            return True
         
-        return resolved
+    def fetch_with_retries(self, partial, filename, record):
+        """Complete a partial download, retrying dropped transfers with backoff
+        
+        A 429 or 5xx waits for its Retry-After, if any, instead of the backoff.
+        Returns False (after reporting the failure) if it could not be completed.
+        A cancelled download keeps its .part so the next run can resume it.
+        """
+        last_error = None
+        retry_after = None
+        for attempt in range(DOWNLOAD_ATTEMPTS):
+            if attempt:
+                delay = min(retry_after, MAX_RETRY_DELAY) if retry_after is not None else backoff_delay(attempt - 1)
+                print(f"    ↻ Retrying {filename} in {delay:.1f}s from byte {partial.offset:,} "
+                      f"(attempt {attempt + 1}/{DOWNLOAD_ATTEMPTS})")
+                time.sleep(delay)
+            
+            try:
+                if attempt == 0:
+                    print(f"    Downloading {filename}{f' (resuming at byte {partial.offset:,})' if partial.offset else ''}...")
+                self.fetch_partial(partial, record)
+                return True
+            except requests.exceptions.HTTPError as e:
+                last_error = e
+                if e.response is not None and e.response.status_code not in RETRYABLE_STATUSES:
+                    partial.discard()
+                    print(f"    ✗ Failed to download {filename}: {e}")
+                    self.emit('download_failed', filename=filename, error=str(e))
+                    return False
+                retry_after = retry_after_delay(e.response) if e.response is not None else None
+            except (requests.exceptions.RequestException, OSError) as e:
+                last_error = e
+                retry_after = None
+        
+        print(f"    ✗ Failed to download {filename}: {last_error}"
+              f"{' (partial download kept for resume)' if partial.offset else ''}")
+        self.emit('download_failed', filename=filename, error=str(last_error))
+        return False
     
-    def download_file(self, url, filename, download_dir):
-        """Download a file from URL"""
-        filepath = Path(download_dir) / filename
+    def fetch_partial(self, partial, record=None):
+        """Stream the rest of a partial download into its .part file
         
-        try:
-            print(f"    Downloading {filename}...")
-            response = self.session.get(url, stream=True)
+        Asks for the missing bytes with Range/If-Range; if the server answers with
+        the whole file instead (no range support, or the file changed) the partial
+        data is dropped and the download starts over. Time to first byte, bytes
+        received and time spent writing are added to record (a profiler span).
+        """
+        record = record if record is not None else {}
+        headers = {}
+        if partial.offset:
+            headers['Range'] = f"bytes={partial.offset}-"
+            if partial.validator:
+                headers['If-Range'] = partial.validator
+        
+        response = self.session.get(partial.url, stream=True, headers=headers, timeout=DOWNLOAD_TIMEOUT)
+        record['ttfb'] = response.elapsed.total_seconds()
+        with response:
+            if response.status_code == 416 and partial.offset:
+                # Our partial data no longer lines up with the file; start over
+                partial.reset()
+                raise requests.exceptions.ConnectionError("Range not satisfiable, restarting download")
             response.raise_for_status()
             
-            with open(filepath, 'wb') as f:
+            content_range = response.headers.get('Content-Range', '')
+            resumed = (response.status_code == 206 and partial.offset
+                       and content_range.startswith(f"bytes {partial.offset}-"))
+            if resumed:
+                partial.resumed = True
+            else:
+                partial.reset()
+            partial.set_validator(response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            
+            total = response.headers.get('Content-Length')
+            total = partial.offset + int(total) if total and total.isdigit() else None
+            last_report = 0.0
+            
+            with open(partial.path, 'ab' if resumed else 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
+                    self.check_cancelled()
                     if chunk:
+                        write_started = time.perf_counter()
                         f.write(chunk)
+                        record['write_seconds'] = record.get('write_seconds', 0.0) + time.perf_counter() - write_started
+                        record['bytes'] = record.get('bytes', 0) + len(chunk)
+                        partial.update(chunk)
+                        
+                        now = time.monotonic()
+                        if now - last_report >= PROGRESS_INTERVAL:
+                            last_report = now
+                            self.emit('download_progress', filename=partial.filename,
+                                      bytes=partial.offset, total=total)
             
-            print(f"    ✓ Downloaded to {filepath}")
-            return True
-        except requests.exceptions.RequestException as e:
-            print(f"    ✗ Failed to download {filename}: {e}")
-            return False
+            self.emit('download_progress', filename=partial.filename, bytes=partial.offset, total=total)
+    
+    def get_primary_file(self, version_data):
+        """Pick the primary file of a version, falling back to the first file"""
+        files = version_data.get('files', [])
+        for file_info in files:
+            if file_info.get('primary', False):
+                return file_info
+        return files[0] if files else None
     
     def install_mod(self, slug, loader="forge", game_version="1.20.1", download_dir="mods"):
         """Install a mod and its dependencies"""
-        print(f"Installing mod: {slug}")
-        print(f"Target: {loader} {game_version}")
-        print(f"Download directory: {download_dir}")
-        print("-" * 50)
-        
-        # Create download directory
-        Path(download_dir).mkdir(exist_ok=True)
+        results = self.install_mods([slug], loader, game_version, download_dir)
+        return results.get(slug, False)
+    
+    def resolve_mod(self, slug, loader="forge", game_version="1.20.1"):
+        """Find a requested mod and its latest compatible version
         
-        # Get main mod info
+        Returns {'project_info', 'version_data'} or None if it cannot be installed.
+        """
         project_info = self.get_project_info(slug)
         if not project_info:
             print(f"❌ Could not find project: {slug}")
-            return False
+            self.emit('mod_failed', slug=slug, reason='project not found')
+            return None
         
         print(f"📦 {project_info['title']}")
         print(f"   {project_info['description']}")
         
-        # Get compatible versions
-        versions = self.get_versions(slug, loader, game_version)
+        versions = self.get_versions(project_info['id'], loader, game_version)
         if not versions:
-            print(f"❌ No compatible versions found for {loader} {game_version}")
-            return False
+            print(f"❌ No compatible versions found for {slug} on {loader} {game_version}")
+            self.emit('mod_failed', slug=slug, reason=f"no compatible version for {loader} {game_version}")
+            return None
         
         main_version = versions[0]  # Latest compatible version
         print(f"   Using version: {main_version['version_number']}")
+        self.emit('mod_resolved', slug=slug, project_id=project_info['id'], version_id=main_version['id'],
+                  version_number=main_version['version_number'])
         
-        # Resolve dependencies
-        print(f"\n🔍 Resolving dependencies...")
-        dependencies = self.resolve_dependencies(main_version, loader, game_version)
+        return {
+            'project_info': project_info,
+            'version_data': main_version
+        }
+    
+    def resolve_mods(self, slugs, loader="forge", game_version="1.20.1"):
+        """Resolve several mods and one shared set of their dependencies
         
-        # Download main mod
-        print(f"\n📥 Downloading main mod...")
-        main_downloaded = False
-        files = main_version.get('files', [])
+        Returns (targets, dependencies, missing): targets maps each resolvable slug
+        to {'project_info', 'version_data'}, dependencies maps project_id to the same
+        shape for everything pulled in that was not requested, and missing lists the
+        slugs that could not be resolved.
+        """
+        with self.span('resolve', None, mods=len(slugs)) as record:
+            targets = {}  # slug -> {'project_info', 'version_data'}
+            resolved = {}  # project_id -> {'project_info', 'version_data'}, shared by all mods
+            missing = []
+            self.emit('resolve_start', slugs=list(slugs), loader=loader, game_version=game_version)
+            
+            # Resolve every requested mod first so dependencies never shadow a requested mod
+            for slug in slugs:
+                self.check_cancelled()
+                if slug in targets or slug in missing:
+                    continue
+                
+                target = self.resolve_mod(slug, loader, game_version)
+                if not target:
+                    missing.append(slug)
+                    continue
+                
+                targets[slug] = target
+                resolved[target['project_info']['id']] = target
+            
+            # Resolve dependencies into one shared set
+            if targets:
+                print(f"\n🔍 Resolving dependencies...")
+                self.resolve_dependency_levels(
+                    [target['version_data'] for target in targets.values()], loader, game_version, resolved, record
+                )
+            
+            target_ids = {target['project_info']['id'] for target in targets.values()}
+            dependencies = {
+                project_id: dep_info for project_id, dep_info in resolved.items()
+                if project_id not in target_ids
+            }
+            return targets, dependencies, missing
+    
+    def build_graph(self, targets, dependencies):
+        """Build the DependencyGraph of a resolution from resolve_mods, with every edge type"""
+        graph = DependencyGraph()
+        entries = list(targets.values()) + list(dependencies.values())
+        requested = {target['project_info']['id'] for target in targets.values()}
+        for entry in entries:
+            graph.add_node(entry, requested=entry['project_info']['id'] in requested)
         
-        if not files:
-            print(f"    ❌ No files found for {project_info['title']}")
-            return False
+        # Dependencies naming only a version belong to the project of that version, if known
+        version_projects = {node['version_id']: project_id for project_id, node in graph.nodes.items()}
+        for entry in entries:
+            version = entry['version_data']
+            for dep in version.get('dependencies', []):
+                target = dep.get('project_id')
+                if not target and dep.get('version_id'):
+                    known = self.memo.get(('version', dep['version_id']))
+                    target = version_projects.get(dep['version_id']) or (known['project_id'] if known else None)
+                graph.add_edge(entry['project_info']['id'], target, dep['dependency_type'], dep.get('version_id'))
+        return graph
+    
+    def report_conflicts(self, graph):
+        """Print and emit the conflicts in graph; returns them
         
-        # Try to find primary file, fallback to first file
-        primary_file = None
-        for file_info in files:
-            if file_info.get('primary', False):
-                primary_file = file_info
-                break
+        The emitted conflicts also carry the printed 'message', for callers
+        that show them to a user.
+        """
+        conflicts = graph.conflicts()
         
-        if not primary_file and files:
-            primary_file = files[0]  # Use first file if no primary found
+        def label(project_id):
+            node = graph.nodes[project_id]
+            return f"{node['title']} {node['version_number']}"
         
-        if primary_file:
-            filename = primary_file['filename']
-            url = primary_file['url']
-            if self.download_file(url, filename, download_dir):
-                main_downloaded = True
+        def version_label(version_id):
+            version = self.memo.get(('version', version_id))
+            return version['version_number'] if version else version_id
         
-        if not main_downloaded:
-            print(f"    ❌ Failed to download main mod for {project_info['title']}")
-            return False
+        described = []
+        for conflict in conflicts:
+            if conflict['type'] == 'incompatible':
+                message = f"{label(conflict['project_id'])} is incompatible with {label(conflict['with'])}"
+            else:
+                wanted = '; '.join(
+                    f"{version_label(version_id)} by {', '.join(graph.nodes[source]['slug'] for source in sources)}"
+                    for version_id, sources in conflict['required'].items()
+                )
+                message = f"{label(conflict['project_id'])} is required at other versions ({wanted})"
+            print(f"⚠️ Conflict: {message}")
+            described.append({**conflict, 'message': message})
+        if conflicts:
+            self.emit('conflicts', conflicts=described)
+        return conflicts
+    
+    def install_mods(self, slugs, loader="forge", game_version="1.20.1", download_dir="mods", lockfile=None,
+                     concurrency=DOWNLOAD_CONCURRENCY, ignore_conflicts=False):
+        """Install several mods in one pass, sharing dependency resolution and downloads
         
-        # Download dependencies
-        if dependencies:
-            print(f"\n📥 Downloading dependencies...")
-            for dep_id, dep_info in dependencies.items():
-                project = dep_info['project_info']
-                version = dep_info['version_data']
-                
-                print(f"  {project['title']} v{version['version_number']}")
-                
-                dep_files = version.get('files', [])
-                if not dep_files:
-                    print(f"    ❌ No files found for dependency {project['title']}")
+        Mods and dependencies are downloaded together through a DownloadScheduler.
+        Conflicts in the resolved set (see DependencyGraph.conflicts) stop the install
+        before anything is downloaded unless ignore_conflicts is set.
+        If lockfile is given, the exact resolved set is written there afterwards.
+        Returns a dict mapping each requested slug to True/False.
+        """
+        with self.span('install', None, mods=len(slugs)) as record:
+            offline_misses = self.offline_miss_count
+            print(f"Installing {len(slugs)} mod(s): {', '.join(slugs)}")
+            print(f"Target: {loader} {game_version}")
+            print(f"Download directory: {download_dir}")
+            print("-" * 50)
+            
+            # Create download directory
+            Path(download_dir).mkdir(parents=True, exist_ok=True)
+            
+            targets, dependencies, missing = self.resolve_mods(slugs, loader, game_version)
+            results = {slug: False for slug in missing}
+            
+            if self.report_conflicts(self.build_graph(targets, dependencies)) and not ignore_conflicts:
+                print("❌ Not downloading anything until the conflicts are resolved (--ignore-conflicts to install anyway)")
+                results.update({slug: False for slug in targets})
+                self.print_summary(slugs, results, download_dir)
+                record['success'] = False
+                self.emit('done', success=False, results=results, download_dir=os.path.abspath(download_dir))
+                return results
+            
+            # One job per project, whichever slugs or mods pulled it in
+            jobs = {}  # project_id -> primary file
+            for entry in list(targets.values()) + list(dependencies.values()):
+                project = entry['project_info']
+                if project['id'] in jobs:
                     continue
+                primary_file = self.get_primary_file(entry['version_data'])
+                if not primary_file:
+                    print(f"    ❌ No files found for {project['title']}")
+                jobs[project['id']] = primary_file
+            
+            downloadable = {project_id: file_info for project_id, file_info in jobs.items() if file_info}
+            if downloadable:
+                print(f"\n📥 Downloading {len(downloadable)} file(s) "
+                      f"({len(targets)} mod(s), {len(dependencies)} dependencies)...")
+            outcomes = DownloadScheduler(self, concurrency).run(downloadable.values(), download_dir)
+            downloaded = dict(zip(downloadable, outcomes))
+            
+            for slug, target in targets.items():
+                project = target['project_info']
+                results[slug] = downloaded.get(project['id'], False)
+                if project['id'] in downloadable and not results[slug]:
+                    print(f"    ❌ Failed to download main mod for {project['title']}")
+            
+            self.print_summary(slugs, results, download_dir)
+            if lockfile:
+                self.write_lockfile(lockfile, self.build_lock(targets, dependencies, loader, game_version))
+            record['success'] = self.install_succeeded(results, offline_misses)
+            self.emit('done', success=record['success'], results=results,
+                      download_dir=os.path.abspath(download_dir))
+            return results
+    
+    def build_lock(self, targets, dependencies, loader, game_version):
+        """Describe a resolved install as a lockfile: every file pinned by id, url and hash"""
+        entries = {}
+        for requested, group in ((True, targets.values()), (False, dependencies.values())):
+            for entry in group:
+                project = entry['project_info']
+                version = entry['version_data']
+                file_info = self.get_primary_file(version)
+                if not file_info or project['id'] in entries:
+                    continue
+                entries[project['id']] = {
+                    'project_id': project['id'],
+                    'slug': project['slug'],
+                    'version_id': version['id'],
+                    'version_number': version['version_number'],
+                    'filename': file_info['filename'],
+                    'url': file_info['url'],
+                    'sha512': file_info.get('hashes', {}).get('sha512'),
+                    'sha1': file_info.get('hashes', {}).get('sha1'),
+                    'size': file_info.get('size'),
+                    'loader': loader,
+                    'game_version': game_version,
+                    'requested': requested
+                }
+        
+        return {
+            'lockfile_version': LOCKFILE_VERSION,
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'loader': loader,
+            'game_version': game_version,
+            'mods': sorted(entry['slug'] for entry in entries.values() if entry['requested']),
+            'entries': sorted(entries.values(), key=lambda entry: entry['slug'])
+        }
+    
+    def write_lockfile(self, path, lock):
+        """Write a lockfile atomically"""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(lock, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, path)
+        print(f"🔒 Wrote lockfile with {len(lock['entries'])} file(s) to {path}")
+    
+    def read_lockfile(self, path):
+        """Load and sanity-check a lockfile"""
+        with open(path, encoding='utf-8') as f:
+            lock = json.load(f)
+        if lock.get('lockfile_version') != LOCKFILE_VERSION:
+            raise ValueError(f"Unsupported lockfile version: {lock.get('lockfile_version')}")
+        return lock
+    
+    def install_from_lock(self, lock, download_dir="mods", concurrency=DOWNLOAD_CONCURRENCY):
+        """Download and verify exactly the files pinned by a lockfile
+        
+        No metadata is fetched: every file is downloaded (or linked from the jar
+        store) in parallel and checked against its locked hashes. Returns a dict
+        mapping each locked slug to True/False.
+        """
+        with self.span('install', None, mods=len(lock['entries'])) as record:
+            offline_misses = self.offline_miss_count
+            entries = lock['entries']
+            print(f"Installing {len(entries)} locked file(s) for {lock['loader']} {lock['game_version']}")
+            print(f"Download directory: {download_dir}")
+            print("-" * 50)
+            
+            Path(download_dir).mkdir(parents=True, exist_ok=True)
+            jobs = [
+                {
+                    'url': entry['url'],
+                    'filename': entry['filename'],
+                    'size': entry.get('size'),
+                    'hashes': {algorithm: entry[algorithm] for algorithm in VERIFIED_HASHES if entry.get(algorithm)}
+                }
+                for entry in entries
+            ]
+            outcomes = DownloadScheduler(self, concurrency).run(jobs, download_dir)
+            results = {entry['slug']: ok for entry, ok in zip(entries, outcomes)}
+            
+            slugs = [entry['slug'] for entry in entries]
+            self.print_summary(slugs, results, download_dir)
+            record['success'] = self.install_succeeded(results, offline_misses)
+            self.emit('done', success=record['success'], results=results,
+                      download_dir=os.path.abspath(download_dir))
+            return results
+    
+    def check_updates(self, installed, loader="forge", game_version="1.20.1"):
+        """Find newer compatible versions for installed files in one round trip
+        
+        installed maps each file's sha512 to a label (a path or lockfile slug).
+        A file is up to date when the newest compatible version's primary file
+        has the same hash. Returns {'updates', 'up_to_date', 'unknown'}.
+        """
+        latest_versions = self.get_latest_versions_by_hash(installed, loader, game_version)
+        plan = {'updates': [], 'up_to_date': [], 'unknown': []}
+        
+        for sha512, name in installed.items():
+            version = latest_versions.get(sha512)
+            if not version:
+                plan['unknown'].append(name)
+                continue
+            file_info = self.get_primary_file(version)
+            if not file_info or file_info.get('hashes', {}).get('sha512') == sha512:
+                plan['up_to_date'].append(name)
+                continue
+            plan['updates'].append({
+                'name': name,
+                'project_id': version['project_id'],
+                'version_id': version['id'],
+                'version_number': version['version_number'],
+                'filename': file_info['filename'],
+                'url': file_info['url'],
+                'sha512': file_info.get('hashes', {}).get('sha512')
+            })
+        
+        return plan
+    
+    def plan_sync(self, slugs, loader="forge", game_version="1.20.1", download_dir="mods"):
+        """Work out the minimal changes that bring download_dir to the requested mod set
+        
+        Jars already in the directory are identified by hash through one bulk
+        /version_files lookup and compared with the resolved set. Returns
+        (plan, missing) where plan has 'keep', 'add', 'upgrade', 'remove' and
+        'unknown' lists; 'remove' covers duplicate copies of a project and
+        identified mods outside the requested set (reason 'duplicate' or 'unwanted').
+        plan['complete'] is False when a slug was missing or any lookup failed
+        (or missed offline), since a mod that failed to resolve would otherwise
+        look unwanted.
+        """
+        jars = find_jars(download_dir)
+        print(f"🔎 Hashing {len(jars)} installed jar(s) in {download_dir}...")
+        
+        installed = {}  # project_id -> [(path, version)]
+        unknown = []
+        for path, info in self.identify_files(jars).items():
+            version = info['version']
+            if version:
+                installed.setdefault(version['project_id'], []).append((Path(path), version))
+            else:
+                unknown.append(path)
+        
+        lookup_failures, offline_misses = self.lookup_failure_count, self.offline_miss_count
+        targets, dependencies, missing = self.resolve_mods(slugs, loader, game_version)
+        complete = not missing and lookup_failures == self.lookup_failure_count \
+            and offline_misses == self.offline_miss_count
+        desired = {}
+        for entry in list(targets.values()) + list(dependencies.values()):
+            desired.setdefault(entry['project_info']['id'], entry)
+        
+        plan = {'keep': [], 'add': [], 'upgrade': [], 'remove': [], 'unknown': unknown, 'complete': complete}
+        requested = {entry['project_info']['id']: slug for slug, entry in targets.items()}
+        
+        for project_id, entry in desired.items():
+            version = entry['version_data']
+            item = {
+                'project_id': project_id,
+                'slug': entry['project_info']['slug'],
+                'requested_as': requested.get(project_id),
+                'version_id': version['id'],
+                'version_number': version['version_number'],
+                'file': self.get_primary_file(version)
+            }
+            copies = installed.pop(project_id, [])
+            current = next(((path, v) for path, v in copies if v['id'] == version['id']), None)
+            
+            if current:
+                plan['keep'].append({**item, 'path': str(current[0])})
+                extras = [(path, v) for path, v in copies if path != current[0]]
+            elif copies:
+                plan['upgrade'].append({**item, 'replaces': [str(path) for path, _ in copies]})
+                extras = []
+            else:
+                plan['add'].append(item)
+                extras = []
+            
+            for path, old_version in extras:
+                plan['remove'].append({'project_id': project_id, 'version_id': old_version['id'],
+                                       'path': str(path), 'reason': 'duplicate'})
+        
+        for project_id, copies in installed.items():
+            for path, old_version in copies:
+                plan['remove'].append({'project_id': project_id, 'version_id': old_version['id'],
+                                       'path': str(path), 'reason': 'unwanted'})
+        
+        return plan, missing
+    
+    def sync_mods(self, slugs, loader="forge", game_version="1.20.1", download_dir="mods",
+                  prune=False, dry_run=False, concurrency=DOWNLOAD_CONCURRENCY):
+        """Bring download_dir to the requested mod set, downloading only the difference
+        
+        Duplicate copies of a project are always removed; identified mods outside
+        the requested set are only removed with prune, and never when the plan is
+        incomplete (see plan_sync). Returns (results, plan) where
+        results maps each requested slug to True/False.
+        """
+        offline_misses = self.offline_miss_count
+        print(f"Syncing {len(slugs)} mod(s) into {download_dir}: {', '.join(slugs)}")
+        print(f"Target: {loader} {game_version}")
+        print("-" * 50)
+        
+        Path(download_dir).mkdir(parents=True, exist_ok=True)
+        plan, missing = self.plan_sync(slugs, loader, game_version, download_dir)
+        self.print_plan(plan, prune)
+        self.emit('sync_plan', plan=plan, prune=prune, dry_run=dry_run)
+        
+        results = {slug: False for slug in missing}
+        for item in plan['keep']:
+            if item['requested_as']:
+                results[item['requested_as']] = True
+        if dry_run:
+            for item in plan['add'] + plan['upgrade']:
+                if item['requested_as']:
+                    results[item['requested_as']] = True
+            return results, plan
+        
+        if plan['add'] or plan['upgrade']:
+            print(f"\n📥 Downloading {len(plan['add']) + len(plan['upgrade'])} file(s)...")
+        items = [item for item in plan['add'] + plan['upgrade'] if item['file']]
+        outcomes = DownloadScheduler(self, concurrency).run((item['file'] for item in items), download_dir)
+        for item in plan['add'] + plan['upgrade']:
+            file_info = item['file']
+            ok = bool(file_info) and outcomes[items.index(item)]
+            if ok:
+                # Drop the old copies only once the replacement is in place
+                new_path = str(Path(download_dir) / file_info['filename'])
+                for old_path in item.get('replaces', []):
+                    if old_path != new_path:
+                        Path(old_path).unlink(missing_ok=True)
+            if item['requested_as']:
+                results[item['requested_as']] = ok
+        
+        if prune and not plan['complete']:
+            print("\n⚠️ Some mods could not be resolved; not pruning anything this run")
+        for item in plan['remove']:
+            if item['reason'] == 'duplicate' or (prune and plan['complete']):
+                Path(item['path']).unlink(missing_ok=True)
+                print(f"  🗑️ Removed {Path(item['path']).name} ({item['reason']})")
+        
+        self.print_summary(slugs, results, download_dir)
+        self.emit('done', success=self.install_succeeded(results, offline_misses), results=results,
+                  download_dir=os.path.abspath(download_dir))
+        return results, plan
+    
+    def print_plan(self, plan, prune=False):
+        """Print a sync plan"""
+        print(f"\n📋 Sync plan: {len(plan['keep'])} up to date, {len(plan['add'])} to add, "
+              f"{len(plan['upgrade'])} to upgrade, {len(plan['remove'])} to remove, "
+              f"{len(plan['unknown'])} unidentified")
+        for item in plan['add']:
+            print(f"  + {item['slug']} {item['version_number']}")
+        for item in plan['upgrade']:
+            replaced = ', '.join(Path(path).name for path in item['replaces'])
+            print(f"  ↑ {item['slug']} {item['version_number']} (replaces {replaced})")
+        for item in plan['remove']:
+            note = ''
+            if item['reason'] == 'unwanted' and not prune:
+                note = ', kept without --prune'
+            elif item['reason'] == 'unwanted' and not plan['complete']:
+                note = ', kept while the plan is incomplete'
+            print(f"  - {Path(item['path']).name} ({item['reason']}{note})")
+        for path in plan['unknown']:
+            print(f"  ? {Path(path).name} (not found on Modrinth, left alone)")
+    
+    def print_summary(self, slugs, results, download_dir):
+        """Print the per-slug install summary read by the Node backend"""
+        installed = [slug for slug in slugs if results.get(slug)]
+        failed = [slug for slug in slugs if not results.get(slug)]
+        
+        print(f"\n{'✅' if not failed else '⚠️'} Installation complete: {len(installed)}/{len(results)} mod(s) installed")
+        print(f"   Downloaded to: {os.path.abspath(download_dir)}")
+        for slug in installed:
+            print(f"✅ Installed: {slug}")
+        for slug in failed:
+            print(f"❌ Failed: {slug}")
+
+class AsyncModrinthInstaller:
+    """asyncio version of ModrinthInstaller with concurrent metadata lookups and downloads
+    
+    Exposes the same public methods as coroutines. Blocking HTTP calls run on a
+    thread pool through the wrapped installer's session, and a semaphore bounds how
+    many are in flight, so dependencies of one level are fetched in parallel and
+    jars download concurrently.
+    """
+    
+    def __init__(self, api_key=None, concurrency=8, installer=None):
+        self.installer = installer or ModrinthInstaller(api_key=api_key)
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.semaphore = None  # created inside the running event loop
+        
+        # Keep one pooled connection per concurrent call instead of discarding extras
+        self.installer.mount_adapter(max(concurrency, 10))
+    
+    async def run(self, func, *args):
+        """Run a blocking installer call on the thread pool, bounded by the semaphore"""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            # Worker threads act on behalf of the caller: its cancel event, event sink and span
+            bound = self.installer.bind_thread_context(func)
+            return await loop.run_in_executor(self.executor, functools.partial(bound, *args))
+    
+    async def get_project_info(self, slug):
+        """Get basic project information"""
+        return await self.run(self.installer.get_project_info, slug)
+    
+    async def get_versions(self, slug, loader=None, game_version=None):
+        """Get versions for a project with optional filtering"""
+        return await self.run(self.installer.get_versions, slug, loader, game_version)
+    
+    async def resolve_dependencies(self, version_data, loader, game_version, resolved=None):
+        """Resolve all dependencies level by level, each level concurrently"""
+        if resolved is None:
+            resolved = {}
+        await self.resolve_dependency_levels([version_data], loader, game_version, resolved)
+        return resolved
+    
+    async def resolve_dependency_levels(self, frontier, loader, game_version, resolved, span=None):
+        """Resolve the required dependencies of every version in frontier, breadth first
+        
+        If span (a span record) is given, the number of levels walked is stored as 'depth'.
+        """
+        depth = 0
+        while frontier:
+            depth += 1
+            with self.installer.span('resolve_level', None, depth=depth, frontier=len(frontier)):
+                level = await self.run(self.installer.fetch_dependency_level, frontier, resolved)
                 
-                # Try to find primary file, fallback to first file
-                dep_primary_file = None
-                for file_info in dep_files:
-                    if file_info.get('primary', False):
-                        dep_primary_file = file_info
-                        break
-                
-                if not dep_primary_file and dep_files:
-                    dep_primary_file = dep_files[0]  # Use first file if no primary found
+                dep_entries = await asyncio.gather(*(
+                    self.run(self.installer.select_dependency_version, dep, project_info, candidates,
+                             loader, game_version)
+                    for dep, project_info, candidates in level.values()
+                ))
                 
-                if dep_primary_file:
-                    filename = dep_primary_file['filename']
-                    url = dep_primary_file['url']
-                    self.download_file(url, filename, download_dir)
-        else:
-            print(f"\n📥 No dependencies to download")
+                frontier = []
+                for project_id, dep_entry in zip(level, dep_entries):
+                    if dep_entry:
+                        resolved[project_id] = dep_entry
+                        frontier.append(dep_entry['version_data'])
         
-        print(f"\n✅ Installation complete!")
-        print(f"   Downloaded to: {os.path.abspath(download_dir)}")
-        return True
+        if span is not None:
+            span['depth'] = depth
+        return resolved
+    
+    async def download_file(self, url, filename, download_dir, hashes=None):
+        """Download a file from URL, reusing the jar store when its sha512 is known"""
+        return await self.run(self.installer.download_file, url, filename, download_dir, hashes)
+    
+    def get_primary_file(self, version_data):
+        """Pick the primary file of a version, falling back to the first file"""
+        return self.installer.get_primary_file(version_data)
+    
+    async def install_mod(self, slug, loader="forge", game_version="1.20.1", download_dir="mods"):
+        """Install a mod and its dependencies"""
+        results = await self.install_mods([slug], loader, game_version, download_dir)
+        return results.get(slug, False)
+    
+    async def resolve_mod(self, slug, loader="forge", game_version="1.20.1"):
+        """Find a requested mod and its latest compatible version"""
+        return await self.run(self.installer.resolve_mod, slug, loader, game_version)
+    
+    async def resolve_mods(self, slugs, loader="forge", game_version="1.20.1"):
+        """Resolve several mods and one shared set of their dependencies
+        
+        Returns (targets, dependencies, missing) like ModrinthInstaller.resolve_mods.
+        """
+        with self.installer.span('resolve', None, mods=len(slugs)) as record:
+            unique_slugs = list(dict.fromkeys(slugs))
+            self.installer.emit('resolve_start', slugs=unique_slugs, loader=loader, game_version=game_version)
+            entries = await asyncio.gather(*(
+                self.resolve_mod(slug, loader, game_version) for slug in unique_slugs
+            ))
+            
+            targets = {slug: entry for slug, entry in zip(unique_slugs, entries) if entry}
+            missing = [slug for slug, entry in zip(unique_slugs, entries) if not entry]
+            resolved = {entry['project_info']['id']: entry for entry in targets.values()}
+            
+            if targets:
+                print(f"\n🔍 Resolving dependencies...")
+                await self.resolve_dependency_levels(
+                    [entry['version_data'] for entry in targets.values()], loader, game_version, resolved, record
+                )
+            
+            target_ids = {entry['project_info']['id'] for entry in targets.values()}
+            dependencies = {
+                project_id: dep_info for project_id, dep_info in resolved.items()
+                if project_id not in target_ids
+            }
+            return targets, dependencies, missing
+    
+    async def download_entry(self, entry, download_dir):
+        """Download the primary file of a resolved project"""
+        project = entry['project_info']
+        primary_file = self.get_primary_file(entry['version_data'])
+        if not primary_file:
+            print(f"    ❌ No files found for {project['title']}")
+            return False
+        return await self.download_file(primary_file['url'], primary_file['filename'], download_dir,
+                                        primary_file.get('hashes'))
+    
+    async def install_mods(self, slugs, loader="forge", game_version="1.20.1", download_dir="mods", lockfile=None,
+                           ignore_conflicts=False):
+        """Install several mods, resolving and downloading concurrently
+        
+        Conflicts stop the install before downloading unless ignore_conflicts is set.
+        If lockfile is given, the exact resolved set is written there afterwards.
+        Returns a dict mapping each requested slug to True/False.
+        """
+        with self.installer.span('install', None, mods=len(slugs)) as record:
+            offline_misses = self.installer.offline_miss_count
+            print(f"Installing {len(slugs)} mod(s): {', '.join(slugs)}")
+            print(f"Target: {loader} {game_version} (concurrency {self.concurrency})")
+            print(f"Download directory: {download_dir}")
+            print("-" * 50)
+            
+            Path(download_dir).mkdir(parents=True, exist_ok=True)
+            
+            targets, dependencies, missing = await self.resolve_mods(slugs, loader, game_version)
+            results = {slug: False for slug in missing}
+            
+            graph = self.installer.build_graph(targets, dependencies)
+            if self.installer.report_conflicts(graph) and not ignore_conflicts:
+                print("❌ Not downloading anything until the conflicts are resolved (--ignore-conflicts to install anyway)")
+                results.update({slug: False for slug in targets})
+                self.installer.print_summary(slugs, results, download_dir)
+                record['success'] = False
+                self.installer.emit('done', success=False, results=results, download_dir=os.path.abspath(download_dir))
+                return results
+            
+            # One download per project, whether it was requested, a dependency, or both
+            entries = {}
+            for entry in list(targets.values()) + list(dependencies.values()):
+                entries.setdefault(entry['project_info']['id'], entry)
+            
+            if entries:
+                print(f"\n📥 Downloading {len(entries)} file(s)...")
+            downloaded = await asyncio.gather(*(
+                self.download_entry(entry, download_dir) for entry in entries.values()
+            ))
+            downloaded = dict(zip(entries, downloaded))
+            
+            for slug, entry in targets.items():
+                results[slug] = downloaded[entry['project_info']['id']]
+                if not results[slug]:
+                    print(f"    ❌ Failed to download main mod for {entry['project_info']['title']}")
+            
+            self.installer.print_summary(slugs, results, download_dir)
+            if lockfile:
+                self.installer.write_lockfile(
+                    lockfile, self.installer.build_lock(targets, dependencies, loader, game_version)
+                )
+            record['success'] = self.installer.install_succeeded(results, offline_misses)
+            self.installer.emit('done', success=record['success'], results=results, download_dir=os.path.abspath(download_dir))
+            return results
 
-def main():
-    parser = argparse.ArgumentParser(description="Install mods from Modrinth")
-    parser.add_argument("slug", help="Mod slug to install")
+class InstallerServer:
+    """Long-running worker answering newline-delimited JSON-RPC requests
+    
+    One warm ModrinthInstaller (HTTP session, connection pool and caches) serves
+    every request. Each line on stdin is a request such as
+    {"jsonrpc": "2.0", "id": 1, "method": "install", "params": {...}} and each
+    response is written to stdout as one line. Progress events are sent as
+    {"method": "event"} notifications carrying the id of their request.
+    Human-readable installer output goes to stderr so it never corrupts the
+    protocol stream.
+    """
+    
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    SERVER_ERROR = -32000
+    REQUEST_CANCELLED = -32800
+    
+    def __init__(self, installer, output=None, max_workers=4):
+        self.installer = installer
+        self.output = output or sys.stdout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.write_lock = threading.Lock()
+        self.active = {}  # request id -> cancel event
+        self.active_lock = threading.Lock()
+        self.methods = {
+            'install': self.rpc_install,
+            'resolve': self.rpc_resolve,
+            'get_versions': self.rpc_get_versions,
+            'install_lock': self.rpc_install_lock,
+            'profile': self.rpc_profile,
+        }
+    
+    def serve(self, input_stream=None):
+        """Read requests until EOF, then wait for in-flight requests to finish"""
+        for line in (input_stream or sys.stdin):
+            line = line.strip()
+            if line:
+                self.handle_line(line)
+        self.executor.shutdown(wait=True)
+    
+    def handle_line(self, line):
+        """Parse one request line and answer it inline or on a worker thread"""
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            self.send_error(None, self.PARSE_ERROR, f"Invalid JSON: {e}")
+            return
+        
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            self.send_error(None, self.INVALID_REQUEST, "Request must be an object with a method")
+            return
+        
+        request_id = request.get('id')
+        if isinstance(request_id, bool) or not isinstance(request_id, (str, int, float, type(None))):
+            self.send_error(None, self.INVALID_REQUEST, "Request id must be a string, number or null")
+            return
+        method = request['method']
+        params = request.get('params') or {}
+        if not isinstance(params, dict):
+            self.send_error(request_id, self.INVALID_PARAMS, "Invalid params: params must be an object")
+            return
+        
+        if method == 'cancel':
+            # Answered inline so it is never stuck behind the work it cancels
+            try:
+                self.send_result(request_id, self.rpc_cancel(params))
+            except (KeyError, TypeError, ValueError) as e:
+                self.send_error(request_id, self.INVALID_PARAMS, f"Invalid params: {e}")
+            except Exception as e:
+                self.send_error(request_id, self.SERVER_ERROR, str(e))
+            return
+        
+        handler = self.methods.get(method)
+        if not handler:
+            self.send_error(request_id, self.METHOD_NOT_FOUND, f"Unknown method: {method}")
+            return
+        
+        cancel_event = threading.Event()
+        with self.active_lock:
+            self.active[request_id] = cancel_event
+        self.executor.submit(self.run_request, request_id, handler, params, cancel_event)
+    
+    def run_request(self, request_id, handler, params, cancel_event):
+        """Run one request on a worker thread and send its response"""
+        self.installer.set_cancel_event(cancel_event)
+        self.installer.set_event_sink(lambda event: self.send_event(request_id, event))
+        try:
+            self.send_result(request_id, handler(params))
+        except InstallCancelled:
+            self.send_error(request_id, self.REQUEST_CANCELLED, "Request cancelled")
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_error(request_id, self.INVALID_PARAMS, f"Invalid params: {e}")
+        except Exception as e:
+            self.send_error(request_id, self.SERVER_ERROR, str(e))
+        finally:
+            self.installer.set_cancel_event(None)
+            self.installer.set_event_sink(None)
+            with self.active_lock:
+                self.active.pop(request_id, None)
+            if self.installer.metrics:
+                self.installer.metrics.flush()
+    
+    def rpc_install(self, params):
+        slugs = params['slugs'] if 'slugs' in params else [params['slug']]
+        
+        # Also return the conflicts event, so a caller can say why nothing was installed
+        conflicts = []
+        _, sink, _ = self.installer.thread_context()
+        
+        def collect(event):
+            if event['event'] == 'conflicts':
+                conflicts.extend(event['conflicts'])
+            if sink:
+                sink(event)
+        
+        self.installer.set_event_sink(collect)
+        try:
+            results = self.installer.install_mods(
+                list(dict.fromkeys(slugs)),
+                loader=params.get('loader', 'forge'),
+                game_version=params.get('game_version', '1.20.1'),
+                download_dir=params.get('download_dir', 'mods'),
+                lockfile=params.get('lockfile'),
+                concurrency=params.get('concurrency', DOWNLOAD_CONCURRENCY),
+                ignore_conflicts=params.get('ignore_conflicts', False)
+            )
+        finally:
+            self.installer.set_event_sink(sink)
+        return {'success': all(results.values()), 'results': results, 'conflicts': conflicts}
+    
+    def rpc_install_lock(self, params):
+        lock = params['lock'] if 'lock' in params else self.installer.read_lockfile(params['lockfile'])
+        results = self.installer.install_from_lock(
+            lock,
+            download_dir=params.get('download_dir', 'mods'),
+            concurrency=params.get('concurrency', DOWNLOAD_CONCURRENCY)
+        )
+        return {'success': all(results.values()), 'results': results}
+    
+    def rpc_resolve(self, params):
+        slugs = params['slugs'] if 'slugs' in params else [params['slug']]
+        loader = params.get('loader', 'forge')
+        game_version = params.get('game_version', '1.20.1')
+        targets, dependencies, missing = self.installer.resolve_mods(slugs, loader, game_version)
+        
+        def describe(entry):
+            project = entry['project_info']
+            version = entry['version_data']
+            return {
+                'project_id': project['id'],
+                'slug': project['slug'],
+                'title': project['title'],
+                'version_id': version['id'],
+                'version_number': version['version_number'],
+                'file': self.installer.get_primary_file(version)
+            }
+        
+        return {
+            'mods': {slug: describe(entry) for slug, entry in targets.items()},
+            'dependencies': [describe(entry) for entry in dependencies.values()],
+            'missing': missing,
+            'conflicts': self.installer.build_graph(targets, dependencies).conflicts()
+        }
+    
+    def rpc_get_versions(self, params):
+        return self.installer.get_versions(params['slug'], params.get('loader'), params.get('game_version'))
+    
+    def rpc_profile(self, params):
+        """The worker's profile since start or the last reset (needs --profile or --profile-json)"""
+        if not self.installer.profiler:
+            raise RuntimeError("profiling is not enabled; start the worker with --profile")
+        report = self.installer.profiler.report()
+        if params.get('reset'):
+            self.installer.profiler.reset()
+        return report
+    
+    def rpc_cancel(self, params):
+        with self.active_lock:
+            cancel_event = self.active.get(params['id'])
+        if cancel_event is None:
+            return {'cancelled': False}
+        cancel_event.set()
+        return {'cancelled': True}
+    
+    def send_event(self, request_id, event):
+        """Forward an installer event as a JSON-RPC notification tagged with its request id"""
+        self.send({'jsonrpc': '2.0', 'method': 'event', 'params': {'id': request_id, **event}})
+    
+    def send_result(self, request_id, result):
+        self.send({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+    
+    def send_error(self, request_id, code, message):
+        self.send({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}})
+    
+    def send(self, message):
+        with self.write_lock:
+            self.output.write(json.dumps(message) + "\n")
+            self.output.flush()
+
+def ndjson_writer(stream):
+    """Event sink writing one JSON object per line, safe to call from any thread"""
+    lock = threading.Lock()
+    
+    def write(event):
+        line = json.dumps({'ts': round(time.time(), 3), **event})
+        with lock:
+            stream.write(line + "\n")
+            stream.flush()
+    
+    return write
+
+def read_slugs_file(path):
+    """Read slugs from a file (or stdin for '-'), one per line, '#' starts a comment"""
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        slugs = []
+        for line in handle:
+            slug = line.split('#', 1)[0].strip()
+            if slug:
+                slugs.append(slug)
+        return slugs
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def default_cache_dir():
+    """Per-user cache directory, overridable with MODWING_CACHE_DIR"""
+    if os.environ.get("MODWING_CACHE_DIR"):
+        return os.environ["MODWING_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "modwing")
+
+def build_installer(args):
+    """Create a ModrinthInstaller from parsed command line options"""
+    return ModrinthInstaller(
+        api_key=args.api_key,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_size=args.cache_size_mb * 1024 * 1024,
+        store_dir=None if args.no_store else os.path.join(args.cache_dir, "jars"),
+        store_size=args.store_size_mb * 1024 * 1024,
+        offline=args.offline,
+        base_url=args.base_url
+    )
+
+def add_target_arguments(parser):
+    """Options describing the server being installed to"""
     parser.add_argument("--loader", default="forge", help="Mod loader (default: forge)")
     parser.add_argument("--game-version", default="1.20.1", help="Minecraft version (default: 1.20.1)")
     parser.add_argument("--download-dir", default="mods", help="Download directory (default: mods)")
+
+def add_installer_arguments(parser):
+    """Options shared by every command that talks to Modrinth"""
     parser.add_argument("--api-key", help="Modrinth API key (optional)")
-    
-    args = parser.parse_args()
-    
-    installer = ModrinthInstaller(api_key=args.api_key)
-    
+    parser.add_argument("--base-url", default=os.environ.get("MODWING_API_URL", DEFAULT_BASE_URL),
+                        help="Modrinth API base URL (default: %(default)s, or $MODWING_API_URL)")
+    parser.add_argument("--cache-dir", default=default_cache_dir(),
+                        help="Directory for cached API metadata (default: %(default)s)")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+                        help="Metadata cache size cap in MB (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the on-disk metadata cache")
+    parser.add_argument("--store-size-mb", type=int, default=DEFAULT_STORE_SIZE // (1024 * 1024),
+                        help="Jar store size cap in MB (default: %(default)s)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Disable the content-addressable jar store under the cache directory")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use only the metadata cache and jar store; fail listing anything missing")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-phase timings and per-endpoint request counters at the end")
+    parser.add_argument("--profile-json", metavar="PATH", help="Write the profile as JSON to PATH")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Write a JSON trace of API calls, resolution levels and downloads to PATH")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-textfile", metavar="PATH",
+                        help="Write Prometheus metrics to PATH (node_exporter textfile collector)")
+    parser.add_argument("--events", choices=["ndjson"],
+                        help="Emit machine-readable progress events on stdout (human output moves to stderr)")
+
+def add_slug_arguments(parser, action):
+    parser.add_argument("slugs", nargs="*", metavar="slug", help=f"Mod slug(s) to {action}")
+    parser.add_argument("--slugs-file", help="Read additional slugs from a file, one per line ('-' for stdin)")
+
+def collect_slugs(args):
+    """Positional slugs plus --slugs-file, first occurrence of each kept in order"""
+    slugs = list(args.slugs)
+    if args.slugs_file:
+        slugs.extend(read_slugs_file(args.slugs_file))
+    return list(dict.fromkeys(slugs))
+
+def enable_metrics(installer, args):
+    """Turn on metrics for --metrics-port and/or --metrics-textfile"""
+    if args.metrics_port is None and not args.metrics_textfile:
+        return
+    metrics = installer.enable_metrics(args.metrics_textfile)
+    if args.metrics_port is not None:
+        metrics.serve(args.metrics_port)
+
+def setup_installer(args):
+    """Build the installer and, for --events ndjson, route events to stdout and logs to stderr"""
+    events_output = sys.stdout
+    if args.events == "ndjson":
+        sys.stdout = sys.stderr
+    installer = build_installer(args)
+    if args.profile or args.profile_json:
+        installer.enable_profiling()
+    enable_metrics(installer, args)
+    if args.trace:
+        installer.set_tracer(JSONFileTracer(args.trace))
+    if args.events == "ndjson":
+        installer.event_sink = ndjson_writer(events_output)
+    return installer
+
+def report_profile(installer, args):
+    """Print and/or save the profile of a finished (or failed) command"""
+    if not installer.profiler:
+        return
+    if args.profile:
+        installer.profiler.print_table()
+    if args.profile_json:
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            json.dump(installer.profiler.report(), f, indent=2)
+            f.write("\n")
+        print(f"⏱️  Wrote profile to {args.profile_json}")
+
+def run_cli(action, installer, args):
+    """Run a command, mapping interrupts, errors and failed results to exit codes"""
     try:
-        installer.install_mod(
-            slug=args.slug,
-            loader=args.loader,
-            game_version=args.game_version,
-            download_dir=args.download_dir
-        )
+        ok = action()
+        if installer.offline_missing:
+            installer.print_offline_missing()
+            ok = False
+        if not ok:
+            sys.exit(1)
     except KeyboardInterrupt:
         print(f"\n❌ Installation cancelled by user")
         sys.exit(1)
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        report_profile(installer, args)
+        installer.tracer.close()
+        if installer.metrics:
+            installer.metrics.flush()
+
+def install_command(argv):
+    parser = argparse.ArgumentParser(description="Install mods from Modrinth")
+    add_slug_arguments(parser, "install")
+    add_target_arguments(parser)
+    add_installer_arguments(parser)
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Resolve and download concurrently with the asyncio installer")
+    parser.add_argument("--concurrency", type=int, default=DOWNLOAD_CONCURRENCY,
+                        help="Maximum concurrent downloads (and requests with --async) (default: %(default)s)")
+    parser.add_argument("--write-lock", metavar="PATH", help="Write a lockfile of the resolved install")
+    parser.add_argument("--ignore-conflicts", action="store_true",
+                        help="Install even if resolved mods are incompatible or need different versions of a dependency")
+    parser.add_argument("--from-lock", metavar="PATH",
+                        help="Install exactly the files in a lockfile, skipping all metadata lookups")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a long-lived worker answering JSON-RPC requests on stdin/stdout")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent requests handled in --serve mode (default: 4)")
+    
+    args = parser.parse_args(argv)
+    
+    if args.serve:
+        # Keep stdout for protocol messages, send all human-readable output to stderr
+        protocol_output = sys.stdout
+        sys.stdout = sys.stderr
+        installer = build_installer(args)
+        if args.profile or args.profile_json:
+            installer.enable_profiling()
+        enable_metrics(installer, args)
+        if args.trace:
+            installer.set_tracer(JSONFileTracer(args.trace))
+        server = InstallerServer(installer, protocol_output, args.workers)
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            report_profile(installer, args)
+            installer.tracer.close()
+        return
+    
+    try:
+        slugs = collect_slugs(args)
+    except OSError as e:
+        parser.error(f"could not read --slugs-file: {e}")
+    if not slugs and not args.from_lock:
+        parser.error("no mod slugs given")
+    if slugs and args.from_lock:
+        parser.error("--from-lock installs the lockfile's mods; don't pass slugs as well")
+    
+    installer = setup_installer(args)
+    
+    def install():
+        if args.from_lock:
+            results = installer.install_from_lock(
+                installer.read_lockfile(args.from_lock),
+                download_dir=args.download_dir,
+                concurrency=args.concurrency
+            )
+        elif args.use_async:
+            results = asyncio.run(AsyncModrinthInstaller(concurrency=args.concurrency, installer=installer).install_mods(
+                slugs,
+                loader=args.loader,
+                game_version=args.game_version,
+                download_dir=args.download_dir,
+                lockfile=args.write_lock,
+                ignore_conflicts=args.ignore_conflicts
+            ))
+        else:
+            results = installer.install_mods(
+                slugs,
+                loader=args.loader,
+                game_version=args.game_version,
+                download_dir=args.download_dir,
+                lockfile=args.write_lock,
+                concurrency=args.concurrency,
+                ignore_conflicts=args.ignore_conflicts
+            )
+        return all(results.values())
+    
+    run_cli(install, installer, args)
+
+def sync_command(argv):
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} sync",
+        description="Make a mods directory match a set of mods, downloading only what changed"
+    )
+    add_slug_arguments(parser, "keep installed")
+    add_target_arguments(parser)
+    add_installer_arguments(parser)
+    parser.add_argument("--prune", action="store_true",
+                        help="Also delete identified Modrinth mods that are not in the requested set")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without changing anything")
+    parser.add_argument("--concurrency", type=int, default=DOWNLOAD_CONCURRENCY,
+                        help="Maximum concurrent downloads (default: %(default)s)")
+    
+    args = parser.parse_args(argv)
+    try:
+        slugs = collect_slugs(args)
+    except OSError as e:
+        parser.error(f"could not read --slugs-file: {e}")
+    if not slugs:
+        parser.error("no mod slugs given")
+    
+    installer = setup_installer(args)
+    
+    def sync():
+        results, _ = installer.sync_mods(
+            slugs,
+            loader=args.loader,
+            game_version=args.game_version,
+            download_dir=args.download_dir,
+            prune=args.prune,
+            dry_run=args.dry_run,
+            concurrency=args.concurrency
+        )
+        return all(results.values())
+    
+    run_cli(sync, installer, args)
+
+def identify_command(argv):
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} identify",
+        description="Identify installed jars by hash and report duplicate copies of a mod"
+    )
+    parser.add_argument("paths", nargs="*", metavar="path",
+                        help="Jar files or mods directories (default: --download-dir)")
+    parser.add_argument("--download-dir", default="mods", help="Mods directory (default: mods)")
+    parser.add_argument("--workers", type=int, help="Hashing threads (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    add_installer_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    paths = []
+    for path in args.paths or [args.download_dir]:
+        paths.extend(find_jars(path) if Path(path).is_dir() else [Path(path)])
+    
+    installer = setup_installer(args)
+    
+    def identify():
+        identified = installer.identify_files(paths, workers=args.workers)
+        by_project = {}
+        for path, info in identified.items():
+            if info['version']:
+                by_project.setdefault(info['version']['project_id'], []).append(path)
+        duplicates = {project_id: files for project_id, files in by_project.items() if len(files) > 1}
+        
+        if args.json:
+            print(json.dumps({
+                'files': [
+                    {
+                        'path': path,
+                        'sha1': info['sha1'],
+                        'sha512': info['sha512'],
+                        'size': info['size'],
+                        'project_id': info['version']['project_id'] if info['version'] else None,
+                        'version_id': info['version']['id'] if info['version'] else None,
+                        'version_number': info['version']['version_number'] if info['version'] else None
+                    }
+                    for path, info in identified.items()
+                ],
+                'duplicates': duplicates
+            }, indent=2))
+            return True
+        
+        for path, info in identified.items():
+            version = info['version']
+            if version:
+                print(f"✅ {Path(path).name}: project {version['project_id']}, version {version['version_number']} ({version['id']})")
+            else:
+                print(f"❓ {Path(path).name}: not found on Modrinth")
+        for project_id, files in duplicates.items():
+            print(f"⚠️ Duplicate copies of project {project_id}: {', '.join(Path(f).name for f in files)}")
+        return True
+    
+    run_cli(identify, installer, args)
+
+def updates_command(argv):
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} updates",
+        description="List installed mods that have a newer compatible version"
+    )
+    parser.add_argument("source", nargs="?", default="mods",
+                        help="Mods directory or lockfile to check (default: mods)")
+    parser.add_argument("--loader", help="Mod loader (default: forge, or the lockfile's)")
+    parser.add_argument("--game-version", help="Minecraft version (default: 1.20.1, or the lockfile's)")
+    parser.add_argument("--json", action="store_true", help="Print the upgrade plan as JSON")
+    add_installer_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    installer = setup_installer(args)
+    
+    def updates():
+        loader, game_version = args.loader, args.game_version
+        if Path(args.source).is_file():
+            lock = installer.read_lockfile(args.source)
+            installed = {entry['sha512']: entry['slug'] for entry in lock['entries'] if entry.get('sha512')}
+            loader = loader or lock['loader']
+            game_version = game_version or lock['game_version']
+        else:
+            jars = find_jars(args.source)
+            installed = {digests['sha512']: str(path) for path, digests in hash_files(jars, ['sha512']).items()}
+        loader = loader or "forge"
+        game_version = game_version or "1.20.1"
+        
+        plan = installer.check_updates(installed, loader, game_version)
+        if args.json:
+            print(json.dumps({'loader': loader, 'game_version': game_version, **plan}, indent=2))
+            return True
+        
+        print(f"🔄 {len(plan['updates'])} update(s) for {loader} {game_version}, "
+              f"{len(plan['up_to_date'])} up to date, {len(plan['unknown'])} not found on Modrinth")
+        for update in plan['updates']:
+            print(f"  ↑ {Path(update['name']).name} → {update['version_number']} ({update['filename']})")
+        return True
+    
+    run_cli(updates, installer, args)
+
+def graph_command(argv):
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} graph",
+        description="Resolve mods without downloading, check for conflicts and export the dependency graph"
+    )
+    add_slug_arguments(parser, "resolve")
+    parser.add_argument("--loader", default="forge", help="Mod loader (default: forge)")
+    parser.add_argument("--game-version", default="1.20.1", help="Minecraft version (default: 1.20.1)")
+    parser.add_argument("--output", "-o", metavar="PATH",
+                        help="Write the graph to PATH instead of stdout (human output then stays on stdout)")
+    parser.add_argument("--format", choices=["json", "dot"],
+                        help="Graph format (default: dot for a .dot/.gv output, json otherwise)")
+    add_installer_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    try:
+        slugs = collect_slugs(args)
+    except OSError as e:
+        parser.error(f"could not read --slugs-file: {e}")
+    if not slugs:
+        parser.error("no mod slugs given")
+    graph_format = args.format or ("dot" if args.output and Path(args.output).suffix in (".dot", ".gv") else "json")
+    
+    # Keep stdout for the graph itself when it isn't written to a file
+    graph_output = None
+    if not args.output:
+        graph_output = sys.stdout
+        sys.stdout = sys.stderr
+    installer = setup_installer(args)
+    
+    def graph():
+        targets, dependencies, missing = installer.resolve_mods(slugs, args.loader, args.game_version)
+        graph = installer.build_graph(targets, dependencies)
+        text = graph.to_dot() if graph_format == "dot" else json.dumps(graph.to_json(), indent=2) + "\n"
+        if graph_output:
+            graph_output.write(text)
+            graph_output.flush()
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"🕸️ Wrote graph of {len(graph.nodes)} project(s) and {len(graph.edges)} edge(s) to {args.output}")
+        
+        conflicts = installer.report_conflicts(graph)
+        if not conflicts:
+            print("✅ No conflicts")
+        return not missing and not conflicts
+    
+    run_cli(graph, installer, args)
+
+# Subcommands; anything else on the command line is treated as `install`
+COMMANDS = {
+    'install': install_command,
+    'sync': sync_command,
+    'identify': identify_command,
+    'updates': updates_command,
+    'graph': graph_command,
+}
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command = argv.pop(0) if argv and argv[0] in COMMANDS else 'install'
+    COMMANDS[command](argv)
 
 if __name__ == "__main__":
     main()
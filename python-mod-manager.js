@@ -8,6 +8,9 @@ class PythonModManager {
         this.modQueue = new Map(); // serverId -> array of mod slugs
         this.downloadResults = new Map(); // serverId -> download results for upload
         this.pythonScript = path.join(__dirname, 'modrinth_installer.py');
+        this.worker = null; // persistent Python installer process (--serve)
+        this.workerRequests = new Map(); // request id -> pending promise handlers
+        this.nextRequestId = 1;
         
         this.initDirectories();
     }
@@ -183,7 +186,7 @@ class PythonModManager {
     /**
      * Install all queued mods using Python script
      */
-    async installQueuedMods(serverId, serverData) {
+    async installQueuedMods(serverId, serverData, options = {}) {
         const queue = this.getModQueue(serverId);
         
         if (queue.length === 0) {
@@ -207,75 +210,63 @@ class PythonModManager {
             // Install each mod using Python script to temp directory
             const downloadedFiles = [];
             const failedMods = [];
+            let installedFiles = [];
             
-            for (const mod of queue) {
-                try {
-                    mod.status = 'installing';
-                    console.log(`📦 Installing mod: ${mod.title} (${mod.slug})...`);
-                    
-                    // Run Python installer for this mod
-                    const result = await this.runPythonInstaller(
-                        mod.slug,
-                        modLoader,
-                        gameVersion,
-                        tempDownloadDir
-                    );
+            // Install the whole queue in one Python process so mods share one
+            // HTTP session, one dependency resolution and one download pass
+            queue.forEach(mod => {
+                mod.status = 'installing';
+            });
+            
+            try {
+                console.log(`📦 Installing mods: ${queue.map(mod => mod.slug).join(', ')}...`);
+                
+                const result = await this.runPythonInstaller(
+                    queue.map(mod => mod.slug),
+                    modLoader,
+                    gameVersion,
+                    tempDownloadDir,
+                    { ignoreConflicts: options.ignoreConflicts }
+                );
+                installedFiles = result.files;
+                
+                for (const mod of queue) {
+                    // Prefer the installer's per-mod verdict, fall back to the exit code
+                    const succeeded = result.modResults.has(mod.slug)
+                        ? result.modResults.get(mod.slug)
+                        : result.success;
                     
-                    if (result.success) {
+                    if (succeeded) {
                         mod.status = 'installed';
                         mod.installedAt = new Date().toISOString();
                         console.log(`✅ Python installer reported success for: ${mod.title}`);
                     } else {
                         mod.status = 'error';
-                        mod.error = result.error;
+                        mod.error = result.error || `Python installer could not install ${mod.slug}`;
                         failedMods.push(mod);
-                        console.error(`❌ Failed to install ${mod.title}: ${result.error}`);
+                        console.error(`❌ Failed to install ${mod.title}: ${mod.error}`);
                     }
-                    
-                } catch (error) {
-                    console.error(`❌ Error installing mod ${mod.slug}:`, error.message);
+                }
+                
+            } catch (error) {
+                console.error(`❌ Error installing mods:`, error.message);
+                queue.forEach(mod => {
                     mod.status = 'error';
                     mod.error = error.message;
                     failedMods.push(mod);
-                }
-            }
-            
-            // Get all newly downloaded files from temp directory
-            let allFiles = [];
-            let jarFiles = [];
-            
-            try {
-                allFiles = await fs.readdir(tempDownloadDir);
-                jarFiles = allFiles.filter(f => f.endsWith('.jar'));
-                console.log(`📁 Found ${allFiles.length} total files in temp directory: ${allFiles.join(', ')}`);
-                console.log(`📦 Found ${jarFiles.length} JAR files: ${jarFiles.join(', ')}`);
-            } catch (readDirError) {
-                console.error(`❌ Failed to read temp directory ${tempDownloadDir}:`, readDirError.message);
-                jarFiles = [];
+                });
             }
             
-            // Get detailed info for newly downloaded files
-            const downloadedFileStats = [];
-            if (jarFiles.length > 0) {
-                for (const file of jarFiles) {
-                    try {
-                        const filePath = path.join(tempDownloadDir, file);
-                        const stats = await fs.stat(filePath);
-                        downloadedFileStats.push({
-                            name: file,
-                            size: stats.size,
-                            modified: stats.mtime.toISOString(),
-                            path: filePath,
-                            sizeFormatted: `${(stats.size / 1024 / 1024).toFixed(2)} MB`
-                        });
-                        console.log(`✅ Verified file: ${file} (${(stats.size / 1024 / 1024).toFixed(2)} MB)`);
-                    } catch (statError) {
-                        console.error(`❌ Failed to stat file ${file}:`, statError.message);
-                    }
-                }
-            } else {
-                console.log(`⚠️ No JAR files found in temp directory after installation`);
-            }
+            // The installer reports every file it placed (with size and sha512),
+            // so there is no need to re-scan the temp directory afterwards
+            const downloadedFileStats = installedFiles.map(file => ({
+                name: file.filename,
+                size: file.size,
+                sha512: file.sha512,
+                modified: new Date().toISOString(),
+                path: file.path,
+                sizeFormatted: `${(file.size / 1024 / 1024).toFixed(2)} MB`
+            }));
             
             console.log(`✅ Downloaded ${downloadedFileStats.length} NEW files (mods + dependencies)`);
             downloadedFileStats.forEach(file => {
@@ -285,19 +276,8 @@ class PythonModManager {
             const successfulMods = queue.filter(mod => mod.status === 'installed');
             console.log(`✅ Python installer completed ${successfulMods.length}/${queue.length} mods for server ${serverId}`);
             
-            // Verify that we have files for the successful mods
             if (successfulMods.length > 0 && downloadedFileStats.length === 0) {
-                console.warn(`⚠️ Warning: ${successfulMods.length} mods reported as successful but no files found in temp directory`);
-                console.log(`📁 Temp directory contents:`, allFiles);
-                
-                // Try to re-scan the directory one more time
-                try {
-                    const rescannedFiles = await fs.readdir(tempDownloadDir);
-                    const rescannedJars = rescannedFiles.filter(f => f.endsWith('.jar'));
-                    console.log(`🔍 Re-scan found ${rescannedJars.length} JAR files: ${rescannedJars.join(', ')}`);
-                } catch (rescanError) {
-                    console.error(`❌ Re-scan failed:`, rescanError.message);
-                }
+                console.warn(`⚠️ Warning: ${successfulMods.length} mods reported as successful but the installer reported no files`);
             }
             
             // Store download results for later upload
@@ -314,8 +294,7 @@ class PythonModManager {
             const fileData = [];
             for (const fileInfo of downloadedFileStats) {
                 try {
-                    const filePath = path.join(tempDownloadDir, fileInfo.name);
-                    const fileBuffer = await fs.readFile(filePath);
+                    const fileBuffer = await fs.readFile(fileInfo.path);
                     fileData.push({
                         name: fileInfo.name,
                         data: fileBuffer,
@@ -367,93 +346,196 @@ class PythonModManager {
     }
 
     /**
-     * Run the Python installer script for a single mod
+     * Get the persistent Python installer worker, starting it if needed
      */
-    async runPythonInstaller(modSlug, loader, gameVersion, downloadDir) {
-        return new Promise((resolve) => {
-            const args = [
-                this.pythonScript,
-                modSlug,
-                '--loader', loader,
-                '--game-version', gameVersion,
-                '--download-dir', downloadDir
-            ];
-            
-            console.log(`🐍 Running: python3 ${args.join(' ')}`);
-            
-            const process = spawn('python3', args, {
-                stdio: ['pipe', 'pipe', 'pipe']
+    getWorker() {
+        if (this.worker) {
+            return this.worker;
+        }
+        
+        console.log(`🐍 Starting Python installer worker: python3 ${this.pythonScript} --serve`);
+        
+        const worker = spawn('python3', [this.pythonScript, '--serve'], {
+            stdio: ['pipe', 'pipe', 'pipe']
+        });
+        
+        // Responses arrive as one JSON object per line
+        let buffer = '';
+        worker.stdout.on('data', (data) => {
+            buffer += data.toString();
+            let newlineIndex;
+            while ((newlineIndex = buffer.indexOf('\n')) !== -1) {
+                const line = buffer.slice(0, newlineIndex).trim();
+                buffer = buffer.slice(newlineIndex + 1);
+                if (line) {
+                    this.handleWorkerMessage(line);
+                }
+            }
+        });
+        
+        // Human-readable installer output is written to stderr
+        worker.stderr.on('data', (data) => {
+            data.toString().split('\n').forEach(line => {
+                if (line.trim()) {
+                    console.log(`  🐍 ${line.trim()}`);
+                }
             });
+        });
+        
+        worker.stdin.on('error', (error) => {
+            console.error(`❌ Failed to write to Python installer worker: ${error.message}`);
+        });
+        
+        const failPending = (reason) => {
+            if (this.worker !== worker) {
+                return;
+            }
+            this.worker = null;
+            for (const pending of this.workerRequests.values()) {
+                clearTimeout(pending.timeout);
+                pending.reject(new Error(reason));
+            }
+            this.workerRequests.clear();
+        };
+        
+        worker.on('close', (code) => {
+            console.log(`🐍 Python installer worker exited with code ${code}`);
+            failPending(`Python installer worker exited with code ${code}`);
+        });
+        
+        worker.on('error', (error) => {
+            failPending(`Failed to run Python installer worker: ${error.message}`);
+        });
+        
+        this.worker = worker;
+        return worker;
+    }
+
+    /**
+     * Send a JSON-RPC request to the worker and wait for its response
+     */
+    callWorker(method, params, timeoutMs, onEvent = null) {
+        return new Promise((resolve, reject) => {
+            const worker = this.getWorker();
+            const id = this.nextRequestId++;
             
-            let stdout = '';
-            let stderr = '';
-            let isResolved = false;
-            
-            // Set a timeout to prevent hanging processes (2 minutes)
             const timeout = setTimeout(() => {
-                if (!isResolved) {
-                    console.log(`⏰ Python installer timeout for ${modSlug}, killing process...`);
-                    process.kill('SIGTERM');
-                    isResolved = true;
-                    resolve({
-                        success: false,
-                        error: `Installation timeout after 2 minutes for ${modSlug}`,
-                        stdout: stdout,
-                        stderr: stderr
-                    });
+                if (!this.workerRequests.has(id)) {
+                    return;
                 }
-            }, 120000); // 2 minutes timeout
+                this.workerRequests.delete(id);
+                // Ask the worker to abort the request; its reply is ignored
+                this.sendToWorker(worker, this.nextRequestId++, 'cancel', { id });
+                reject(new Error(`Python installer ${method} timed out after ${timeoutMs / 60000} minutes`));
+            }, timeoutMs);
             
-            process.stdout.on('data', (data) => {
-                const output = data.toString();
-                stdout += output;
-                // Log Python output in real-time
-                output.split('\\n').forEach(line => {
-                    if (line.trim()) {
-                        console.log(`  🐍 ${line.trim()}`);
-                    }
-                });
-            });
+            this.workerRequests.set(id, { resolve, reject, timeout, onEvent });
+            this.sendToWorker(worker, id, method, params);
+        });
+    }
+
+    /**
+     * Write one JSON-RPC request line to the worker
+     */
+    sendToWorker(worker, id, method, params) {
+        worker.stdin.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+    }
+
+    /**
+     * Route a worker response or event line to the request waiting for it
+     */
+    handleWorkerMessage(line) {
+        let message;
+        try {
+            message = JSON.parse(line);
+        } catch (parseError) {
+            console.warn(`⚠️ Ignoring malformed worker output: ${line}`);
+            return;
+        }
+        
+        // Progress events are notifications tagged with the request id
+        if (message.method === 'event') {
+            const pending = this.workerRequests.get(message.params.id);
+            if (pending && pending.onEvent) {
+                pending.onEvent(message.params);
+            }
+            return;
+        }
+        
+        const pending = this.workerRequests.get(message.id);
+        if (!pending) {
+            return;
+        }
+        
+        this.workerRequests.delete(message.id);
+        clearTimeout(pending.timeout);
+        
+        if (message.error) {
+            pending.reject(new Error(message.error.message));
+        } else {
+            pending.resolve(message.result);
+        }
+    }
+
+    /**
+     * Run the Python installer for one or more mods on the persistent worker
+     */
+    async runPythonInstaller(modSlugs, loader, gameVersion, downloadDir, { ignoreConflicts = false } = {}) {
+        const slugs = Array.isArray(modSlugs) ? modSlugs : [modSlugs];
+        // 2 minutes for the first mod, 1 more minute for each additional mod
+        const timeoutMs = 120000 + (slugs.length - 1) * 60000;
+        
+        console.log(`🐍 Installing via Python worker: ${slugs.join(', ')} (${loader} ${gameVersion}) -> ${downloadDir}`);
+        
+        // Files placed by the installer, keyed by path, from file_complete events
+        const files = new Map();
+        const onEvent = (event) => {
+            if (event.event === 'file_complete') {
+                files.set(event.path, event);
+            } else if (event.event === 'download_failed') {
+                console.warn(`⚠️ Download failed: ${event.filename} (${event.error})`);
+            } else if (event.event === 'conflicts') {
+                event.conflicts.forEach(conflict => console.warn(`⚠️ Conflict: ${conflict.message}`));
+            }
+        };
+        
+        try {
+            const result = await this.callWorker('install', {
+                slugs: slugs,
+                loader: loader,
+                game_version: gameVersion,
+                download_dir: downloadDir,
+                ignore_conflicts: ignoreConflicts
+            }, timeoutMs, onEvent);
             
-            process.stderr.on('data', (data) => {
-                stderr += data.toString();
-            });
+            const modResults = new Map(Object.entries(result.results || {}));
+            const failed = slugs.filter(slug => !modResults.get(slug));
             
-            process.on('close', (code) => {
-                if (!isResolved) {
-                    clearTimeout(timeout);
-                    isResolved = true;
-                    
-                    if (code === 0) {
-                        resolve({
-                            success: true,
-                            stdout: stdout,
-                            stderr: stderr
-                        });
-                    } else {
-                        resolve({
-                            success: false,
-                            error: `Python installer failed with code ${code}${stderr ? ': ' + stderr : ''}`,
-                            stdout: stdout,
-                            stderr: stderr
-                        });
-                    }
-                }
-            });
+            // Conflicts stop the whole install, so they explain every failure
+            const conflicts = result.conflicts || [];
+            let error;
+            if (conflicts.length > 0 && !ignoreConflicts) {
+                error = `Conflicting mods, nothing was installed: ${conflicts.map(conflict => conflict.message).join('; ')}`;
+            } else if (failed.length > 0) {
+                error = `Python installer could not install: ${failed.join(', ')}`;
+            }
             
-            process.on('error', (error) => {
-                if (!isResolved) {
-                    clearTimeout(timeout);
-                    isResolved = true;
-                    resolve({
-                        success: false,
-                        error: `Failed to run Python installer: ${error.message}`,
-                        stdout: stdout,
-                        stderr: stderr
-                    });
-                }
-            });
-        });
+            return {
+                success: result.success,
+                error: error,
+                conflicts: conflicts,
+                modResults: modResults,
+                files: Array.from(files.values())
+            };
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message,
+                conflicts: [],
+                modResults: new Map(),
+                files: Array.from(files.values())
+            };
+        }
     }
 
     /**
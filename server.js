@@ -804,11 +804,13 @@ app.get('/api/python-mod-manager/servers/:serverId/queue', async (req, res) => {
 app.post('/api/python-mod-manager/servers/:serverId/install-mods', async (req, res) => {
     try {
         const { serverId } = req.params;
-        const { serverData } = req.body;
+        const { serverData, ignoreConflicts } = req.body;
         
         console.log(`🚀 Installing queued mods for server ${serverId} using Python installer`);
         
-        const result = await pythonModManager.installQueuedMods(serverId, serverData);
+        const result = await pythonModManager.installQueuedMods(serverId, serverData, {
+            ignoreConflicts: Boolean(ignoreConflicts)
+        });
         
         res.json({
             success: true,
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "bench"))
+
+from fake_modrinth import FakeModrinthServer, generate_fixture
+from modrinth_installer import ModrinthInstaller
+
+LOADER = "fabric"
+GAME_VERSION = "1.20.1"
+
+@pytest.fixture
+def fixture():
+    """Four mods, each requiring lib-0, with three versions apiece"""
+    return generate_fixture(mods=4, dependencies=1, versions=3, jar_size=32 * 1024,
+                            loader=LOADER, game_version=GAME_VERSION)
+
+@pytest.fixture
+def server(fixture):
+    with FakeModrinthServer(fixture) as server:
+        yield server
+
+@pytest.fixture
+def installer(server, tmp_path):
+    return ModrinthInstaller(base_url=server.base_url, cache_dir=tmp_path / "cache")
+
+def project(fixture, slug):
+    return next(p for p in fixture['projects'] if p['slug'] == slug)
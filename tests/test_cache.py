@@ -0,0 +1,30 @@
+from conftest import GAME_VERSION, LOADER
+from modrinth_installer import ModrinthInstaller
+
+def test_project_fetched_by_slug_is_revalidated_by_id(installer, server, tmp_path):
+    installer.install_mods(["mod-0"], LOADER, GAME_VERSION, tmp_path / "mods")
+    
+    later = ModrinthInstaller(base_url=server.base_url, cache_dir=tmp_path / "cache")
+    before = dict(server.stats)
+    project = later.get_project_info("mod-0")
+    
+    assert project['slug'] == "mod-0"
+    assert server.stats['api_requests'] - before['api_requests'] == 1
+    assert server.stats['not_modified'] - before['not_modified'] == 1
+
+def test_offline_finds_a_project_fetched_by_slug(installer, server, tmp_path):
+    installer.get_project_info("mod-0")
+    
+    offline = ModrinthInstaller(base_url=server.base_url, cache_dir=tmp_path / "cache", offline=True)
+    
+    assert offline.get_project_info("mod-0")['slug'] == "mod-0"
+    assert offline.offline_missing == []
+
+def test_unusable_cache_dir_only_disables_the_cache(server, tmp_path, capsys):
+    (tmp_path / "file").write_text("")
+    installer = ModrinthInstaller(base_url=server.base_url, cache_dir=tmp_path / "file" / "cache",
+                                  store_dir=tmp_path / "file" / "jars")
+    
+    assert installer.cache is None and installer.store is None
+    assert "metadata cache disabled" in capsys.readouterr().out
+    assert installer.install_mods(["mod-0"], LOADER, GAME_VERSION, tmp_path / "mods") == {"mod-0": True}
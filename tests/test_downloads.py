@@ -0,0 +1,91 @@
+import json
+import threading
+
+import pytest
+import requests
+
+from conftest import GAME_VERSION, LOADER
+from modrinth_installer import InstallCancelled, PartialDownload
+
+def primary_file(installer, slug):
+    version = installer.get_versions(slug, LOADER, GAME_VERSION)[0]
+    return installer.get_primary_file(version)
+
+def leave_partial(directory, file_info, data):
+    """Simulate a .part left behind by an interrupted run"""
+    etag = requests.get(file_info['url']).headers['ETag']
+    (directory / f"{file_info['filename']}.part").write_bytes(data)
+    (directory / f"{file_info['filename']}.part.meta").write_text(
+        json.dumps({'url': file_info['url'], 'validator': etag})
+    )
+
+def cancel_after_first_chunk(installer, monkeypatch):
+    """Cancel the installer's current request as soon as a download receives data"""
+    cancel = threading.Event()
+    update = PartialDownload.update
+    
+    def update_then_cancel(partial, chunk):
+        update(partial, chunk)
+        cancel.set()
+    
+    monkeypatch.setattr(PartialDownload, 'update', update_then_cancel)
+    installer.set_cancel_event(cancel)
+
+def test_download_verifies_hashes(installer, tmp_path):
+    file_info = primary_file(installer, "mod-0")
+    
+    assert installer.download_file(file_info['url'], file_info['filename'], tmp_path, file_info['hashes'])
+    assert (tmp_path / file_info['filename']).stat().st_size == file_info['size']
+    assert not (tmp_path / f"{file_info['filename']}.part").exists()
+
+def test_hash_mismatch_discards_the_download(installer, tmp_path):
+    file_info = primary_file(installer, "mod-0")
+    hashes = dict(file_info['hashes'], sha512="0" * 128)
+    
+    assert not installer.download_file(file_info['url'], file_info['filename'], tmp_path, hashes)
+    assert not (tmp_path / file_info['filename']).exists()
+    assert not (tmp_path / f"{file_info['filename']}.part").exists()
+
+def test_partial_download_is_resumed(installer, server, tmp_path):
+    file_info = primary_file(installer, "mod-0")
+    data = requests.get(file_info['url']).content
+    leave_partial(tmp_path, file_info, data[:len(data) // 2])
+    
+    before = server.stats['bytes_sent']
+    assert installer.download_file(file_info['url'], file_info['filename'], tmp_path, file_info['hashes'])
+    assert (tmp_path / file_info['filename']).read_bytes() == data
+    assert server.stats['bytes_sent'] - before < len(data)
+
+def test_corrupt_partial_restarts_from_zero(installer, tmp_path):
+    file_info = primary_file(installer, "mod-0")
+    data = requests.get(file_info['url']).content
+    leave_partial(tmp_path, file_info, b"\0" * (len(data) // 2))
+    
+    assert installer.download_file(file_info['url'], file_info['filename'], tmp_path, file_info['hashes'])
+    assert (tmp_path / file_info['filename']).read_bytes() == data
+
+def test_cancelled_download_keeps_its_partial(installer, server, tmp_path, monkeypatch):
+    file_info = primary_file(installer, "mod-0")
+    cancel_after_first_chunk(installer, monkeypatch)
+    with pytest.raises(InstallCancelled):
+        installer.download_file(file_info['url'], file_info['filename'], tmp_path, file_info['hashes'])
+    
+    assert (tmp_path / f"{file_info['filename']}.part").stat().st_size > 0
+    assert (tmp_path / f"{file_info['filename']}.part.meta").exists()
+    
+    monkeypatch.undo()
+    installer.set_cancel_event(None)
+    before = server.stats['bytes_sent']
+    assert installer.download_file(file_info['url'], file_info['filename'], tmp_path, file_info['hashes'])
+    assert server.stats['bytes_sent'] - before < file_info['size']
+
+def test_cancelled_download_counts_only_the_bytes_received(installer, tmp_path, monkeypatch):
+    file_info = primary_file(installer, "mod-0")
+    metrics = installer.enable_metrics()
+    cancel_after_first_chunk(installer, monkeypatch)
+    with pytest.raises(InstallCancelled):
+        installer.download_file(file_info['url'], file_info['filename'], tmp_path, file_info['hashes'])
+    
+    received = (tmp_path / f"{file_info['filename']}.part").stat().st_size
+    assert received < file_info['size']
+    assert f"modwing_downloaded_bytes_total {received}" in metrics.render().splitlines()
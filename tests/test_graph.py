@@ -0,0 +1,86 @@
+import io
+import json
+
+import pytest
+
+from conftest import GAME_VERSION, LOADER, project
+from fake_modrinth import FakeModrinthServer
+from modrinth_installer import DependencyGraph, InstallerServer, ModrinthInstaller
+
+def newest(fixture, slug):
+    return project(fixture, slug)['versions'][-1]
+
+@pytest.fixture
+def conflicting(fixture):
+    """mod-0 is incompatible with mod-1; mod-2 pins lib-0 to its oldest version"""
+    newest(fixture, "mod-0")['dependencies'].append(
+        {'project_id': project(fixture, "mod-1")['id'], 'version_id': None, 'dependency_type': 'incompatible'}
+    )
+    newest(fixture, "mod-0")['dependencies'].append(
+        {'project_id': "PNOTINSTALLED", 'version_id': None, 'dependency_type': 'optional'}
+    )
+    lib = project(fixture, "lib-0")
+    newest(fixture, "mod-2")['dependencies'] = [
+        {'project_id': lib['id'], 'version_id': lib['versions'][0]['id'], 'dependency_type': 'required'}
+    ]
+    with FakeModrinthServer(fixture) as server:
+        yield ModrinthInstaller(base_url=server.base_url)
+
+def graph_for(installer, slugs):
+    targets, dependencies, missing = installer.resolve_mods(slugs, LOADER, GAME_VERSION)
+    assert missing == []
+    return installer.build_graph(targets, dependencies)
+
+def test_graph_keeps_every_edge_type(conflicting):
+    graph = graph_for(conflicting, ["mod-0", "mod-1"])
+    
+    assert {edge['type'] for edge in graph.edges} == {'required', 'incompatible', 'optional'}
+    assert set(graph.nodes) == {node['project_id'] for node in graph.to_json()['nodes']}
+    dot = graph.to_dot()
+    assert dot.startswith("digraph dependencies {")
+    assert '"PNOTINSTALLED" [style=dashed];' in dot
+
+def test_incompatible_pair_is_flagged(conflicting):
+    conflicts = graph_for(conflicting, ["mod-0", "mod-1"]).conflicts()
+    
+    assert [conflict['type'] for conflict in conflicts] == ['incompatible']
+
+@pytest.mark.parametrize("slugs", [["mod-3", "mod-2"], ["mod-2", "mod-3"]])
+def test_single_pin_wins_regardless_of_order(conflicting, fixture, slugs):
+    graph = graph_for(conflicting, slugs)
+    lib = project(fixture, "lib-0")
+    
+    assert graph.nodes[lib['id']]['version_id'] == lib['versions'][0]['id']
+    assert graph.conflicts() == []
+
+def test_conflict_stops_install_before_downloading(conflicting, tmp_path):
+    results = conflicting.install_mods(["mod-0", "mod-1"], LOADER, GAME_VERSION, tmp_path)
+    
+    assert results == {"mod-0": False, "mod-1": False}
+    assert list(tmp_path.glob("*.jar")) == []
+
+def test_install_rpc_returns_the_conflicts(conflicting, tmp_path):
+    output = io.StringIO()
+    request = {'jsonrpc': "2.0", 'id': 1, 'method': "install", 'params': {
+        'slugs': ["mod-0", "mod-1"], 'loader': LOADER, 'game_version': GAME_VERSION, 'download_dir': str(tmp_path)
+    }}
+    InstallerServer(conflicting, output).serve(io.StringIO(json.dumps(request) + "\n"))
+    result = json.loads(output.getvalue().splitlines()[-1])['result']
+    
+    assert result['success'] is False
+    assert [conflict['type'] for conflict in result['conflicts']] == ['incompatible']
+    assert "is incompatible with" in result['conflicts'][0]['message']
+
+def test_differing_pins_are_a_version_conflict():
+    graph = DependencyGraph()
+    for project_id, version_id in (("A", "A1"), ("B", "B1"), ("L", "L1")):
+        graph.add_node({
+            'project_info': {'id': project_id, 'slug': project_id.lower(), 'title': project_id},
+            'version_data': {'id': version_id, 'version_number': "1.0"}
+        })
+    graph.add_edge("A", "L", "required", "L1")
+    graph.add_edge("B", "L", "required", "L0")
+    
+    assert graph.conflicts() == [{
+        'type': 'version', 'project_id': "L", 'version_id': "L1", 'required': {"L1": ["A"], "L0": ["B"]}
+    }]
@@ -0,0 +1,39 @@
+import pytest
+
+from conftest import GAME_VERSION, LOADER
+from fake_modrinth import generate_fixture
+from modrinth_installer import ModrinthInstaller
+
+@pytest.fixture
+def fixture():
+    """Mods alternate between requiring lib-1 and lib-0, so subsets need different bulk lookups"""
+    return generate_fixture(mods=8, dependencies=1, versions=3, jar_size=32 * 1024,
+                            loader=LOADER, game_version=GAME_VERSION)
+
+def offline_installer(server, tmp_path, events):
+    installer = ModrinthInstaller(base_url=server.base_url, cache_dir=tmp_path / "cache",
+                                  store_dir=tmp_path / "jars", offline=True)
+    installer.event_sink = events.append
+    return installer
+
+def test_offline_install_of_a_subset(server, tmp_path):
+    online = ModrinthInstaller(base_url=server.base_url, cache_dir=tmp_path / "cache", store_dir=tmp_path / "jars")
+    online.install_mods(["mod-0", "mod-1", "mod-2", "mod-3"], LOADER, GAME_VERSION, tmp_path / "online")
+    
+    events = []
+    before = server.stats['requests']
+    results = offline_installer(server, tmp_path, events).install_mods(["mod-0"], LOADER, GAME_VERSION,
+                                                                       tmp_path / "offline")
+    
+    assert results == {"mod-0": True}
+    assert server.stats['requests'] == before
+    assert sorted(path.name.rsplit("-", 1)[0] for path in (tmp_path / "offline").glob("*.jar")) == ["lib-1", "mod-0"]
+    assert events[-1]['event'] == 'done' and events[-1]['success']
+
+def test_offline_miss_fails_the_install(server, tmp_path):
+    events = []
+    installer = offline_installer(server, tmp_path, events)
+    installer.install_mods(["mod-0"], LOADER, GAME_VERSION, tmp_path / "offline")
+    
+    assert installer.offline_missing
+    assert events[-1]['event'] == 'done' and not events[-1]['success']
@@ -0,0 +1,32 @@
+import time
+
+import pytest
+
+import modrinth_installer
+from conftest import GAME_VERSION, LOADER
+from fake_modrinth import FakeModrinthServer
+from modrinth_installer import ModrinthInstaller
+
+@pytest.fixture
+def limited(fixture):
+    """Every third request is answered 429 with Retry-After: 1"""
+    with FakeModrinthServer(fixture, rate_limit_every=3) as server:
+        yield server
+
+def test_install_survives_rate_limiting(limited, tmp_path, monkeypatch):
+    sleeps = []
+    sleep = time.sleep
+    
+    def record_sleep(seconds):
+        sleeps.append(seconds)
+        sleep(min(seconds, 0.05))
+    
+    monkeypatch.setattr(modrinth_installer.time, 'sleep', record_sleep)
+    installer = ModrinthInstaller(base_url=limited.base_url)
+    results = installer.install_mods(["mod-0", "mod-1", "mod-2", "mod-3"], LOADER, GAME_VERSION, tmp_path)
+    
+    assert results == {"mod-0": True, "mod-1": True, "mod-2": True, "mod-3": True}
+    assert len(list(tmp_path.glob("*.jar"))) == 5
+    assert limited.stats['rate_limited'] > 0
+    # Every 429, API or download, was waited out for at least its Retry-After
+    assert sum(1 for seconds in sleeps if seconds >= 1.0) >= limited.stats['rate_limited']
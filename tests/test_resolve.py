@@ -0,0 +1,34 @@
+import pytest
+
+from conftest import GAME_VERSION, LOADER, project
+from fake_modrinth import FakeModrinthServer, generate_fixture
+from modrinth_installer import ModrinthInstaller
+
+@pytest.fixture
+def wide():
+    """mod-0 requires mod-1..10 and each of those requires one of mod-11..20: 20 dependencies in two levels"""
+    fixture = generate_fixture(mods=21, dependencies=0, versions=3, jar_size=1024,
+                               loader=LOADER, game_version=GAME_VERSION)
+    requires = {"mod-0": [f"mod-{index}" for index in range(1, 11)]}
+    requires.update({f"mod-{index}": [f"mod-{index + 10}"] for index in range(1, 11)})
+    for slug, dependencies in requires.items():
+        for version in project(fixture, slug)['versions']:
+            version['dependencies'] = [
+                {'project_id': project(fixture, dep)['id'], 'version_id': None, 'dependency_type': 'required'}
+                for dep in dependencies
+            ]
+    with FakeModrinthServer(fixture) as server:
+        yield server
+
+def test_round_trips_scale_with_depth_not_dependencies(wide):
+    installer = ModrinthInstaller(base_url=wide.base_url)
+    spans = []
+    installer.span_observers.append(spans.append)
+    
+    targets, dependencies, missing = installer.resolve_mods(["mod-0"], LOADER, GAME_VERSION)
+    depth = next(span['depth'] for span in spans if span['phase'] == 'resolve')
+    
+    assert missing == [] and len(dependencies) == 20
+    assert depth == 3  # two levels of dependencies, plus the level that finds none
+    # One project and one version listing for mod-0, then one /projects and one /versions per level
+    assert wide.stats['api_requests'] <= 2 + 2 * (depth - 1)
@@ -0,0 +1,59 @@
+import io
+import json
+
+from conftest import GAME_VERSION, LOADER
+from modrinth_installer import InstallerServer
+
+def serve(installer, *lines):
+    """Run a worker over request lines and return its responses by id, in order"""
+    output = io.StringIO()
+    InstallerServer(installer, output).serve(io.StringIO("\n".join(lines) + "\n"))
+    return [json.loads(line) for line in output.getvalue().splitlines() if 'method' not in json.loads(line)]
+
+def test_malformed_requests_get_errors_and_the_worker_keeps_going(installer):
+    responses = serve(
+        installer,
+        'not json',
+        '[1, 2]',
+        '{"jsonrpc": "2.0", "id": [1], "method": "install", "params": {}}',
+        '{"jsonrpc": "2.0", "id": 2, "method": "install", "params": [1]}',
+        '{"jsonrpc": "2.0", "id": 3, "method": "cancel", "params": {}}',
+        '{"jsonrpc": "2.0", "id": 4, "method": "cancel", "params": {"id": [1]}}',
+        '{"jsonrpc": "2.0", "id": 5, "method": "nope"}',
+        '{"jsonrpc": "2.0", "id": 6, "method": "get_versions", "params": {}}',
+        json.dumps({'jsonrpc': "2.0", 'id': 7, 'method': "get_versions",
+                    'params': {'slug': "mod-0", 'loader': LOADER, 'game_version': GAME_VERSION}}),
+    )
+    errors = {(response['id'] if not isinstance(response['id'], list) else None, response['error']['code'])
+              for response in responses if 'error' in response}
+    
+    assert errors == {
+        (None, InstallerServer.PARSE_ERROR),
+        (None, InstallerServer.INVALID_REQUEST),
+        (2, InstallerServer.INVALID_PARAMS),
+        (3, InstallerServer.INVALID_PARAMS),
+        (4, InstallerServer.INVALID_PARAMS),
+        (5, InstallerServer.METHOD_NOT_FOUND),
+        (6, InstallerServer.INVALID_PARAMS),
+    }
+    result = next(response['result'] for response in responses if response['id'] == 7)
+    assert [version['version_number'] for version in result] == ["1.2.0", "1.1.0", "1.0.0"]
+
+def test_cancel_unknown_request(installer):
+    responses = serve(installer, '{"jsonrpc": "2.0", "id": 1, "method": "cancel", "params": {"id": 99}}')
+    
+    assert responses == [{'jsonrpc': "2.0", 'id': 1, 'result': {'cancelled': False}}]
+
+def test_install_reports_results_and_events(installer, tmp_path):
+    output = io.StringIO()
+    request = {'jsonrpc': "2.0", 'id': 1, 'method': "install", 'params': {
+        'slugs': ["mod-0"], 'loader': LOADER, 'game_version': GAME_VERSION, 'download_dir': str(tmp_path)
+    }}
+    InstallerServer(installer, output).serve(io.StringIO(json.dumps(request) + "\n"))
+    messages = [json.loads(line) for line in output.getvalue().splitlines()]
+    
+    assert messages[-1] == {'jsonrpc': "2.0", 'id': 1, 'result': {
+        'success': True, 'results': {"mod-0": True}, 'conflicts': []
+    }}
+    events = [message['params']['event'] for message in messages if message.get('method') == 'event']
+    assert events[0] == 'resolve_start' and events[-1] == 'done'
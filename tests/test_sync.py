@@ -0,0 +1,79 @@
+import shutil
+
+import requests
+
+from conftest import GAME_VERSION, LOADER, project
+
+def test_sync_plan(installer, fixture, tmp_path):
+    mods = tmp_path / "mods"
+    installer.install_mods(["mod-0", "mod-1"], LOADER, GAME_VERSION, mods)
+    mod_1 = next(mods.glob("mod-1-*.jar"))
+    shutil.copy(mod_1, mods / "copy-of-mod-1.jar")
+    
+    # An outdated mod-2 to be upgraded
+    oldest = installer.get_versions_by_id([project(fixture, "mod-2")['versions'][0]['id']])[0]
+    old_file = installer.get_primary_file(oldest)
+    assert installer.download_file(old_file['url'], old_file['filename'], mods, old_file['hashes'])
+    (mods / "unknown.jar").write_bytes(b"not a published jar")
+    
+    plan, missing = installer.plan_sync(["mod-1", "mod-2", "mod-3"], LOADER, GAME_VERSION, mods)
+    
+    assert missing == []
+    assert {item['slug'] for item in plan['keep']} == {"mod-1", "lib-0"}
+    assert [item['slug'] for item in plan['add']] == ["mod-3"]
+    assert [item['slug'] for item in plan['upgrade']] == ["mod-2"]
+    assert plan['upgrade'][0]['replaces'] == [str(mods / old_file['filename'])]
+    removed = {item['reason']: item['path'] for item in plan['remove']}
+    assert removed['unwanted'].endswith(next(mods.glob("mod-0-*.jar")).name)
+    kept = next(item['path'] for item in plan['keep'] if item['slug'] == "mod-1")
+    assert {kept, removed['duplicate']} == {str(mod_1), str(mods / "copy-of-mod-1.jar")}
+    assert plan['unknown'] == [str(mods / "unknown.jar")]
+
+def test_sync_applies_the_plan(installer, tmp_path):
+    mods = tmp_path / "mods"
+    installer.install_mods(["mod-0", "mod-1"], LOADER, GAME_VERSION, mods)
+    
+    results, _ = installer.sync_mods(["mod-1", "mod-2"], LOADER, GAME_VERSION, mods, prune=True)
+    
+    assert results == {"mod-1": True, "mod-2": True}
+    assert sorted(path.name.rsplit("-", 1)[0] for path in mods.glob("*.jar")) == ["lib-0", "mod-1", "mod-2"]
+
+def test_lockfile_round_trip(installer, server, tmp_path):
+    lockfile = tmp_path / "modwing.lock.json"
+    installer.install_mods(["mod-0", "mod-1"], LOADER, GAME_VERSION, tmp_path / "first", lockfile=lockfile)
+    lock = installer.read_lockfile(lockfile)
+    assert lock['mods'] == ["mod-0", "mod-1"]
+    assert {entry['slug'] for entry in lock['entries']} == {"mod-0", "mod-1", "lib-0"}
+    
+    before = server.stats['api_requests']
+    results = installer.install_from_lock(lock, tmp_path / "second")
+    
+    assert all(results.values())
+    assert server.stats['api_requests'] == before
+    first = sorted(path.name for path in (tmp_path / "first").glob("*.jar"))
+    assert first == sorted(path.name for path in (tmp_path / "second").glob("*.jar"))
+    for name in first:
+        assert (tmp_path / "first" / name).read_bytes() == (tmp_path / "second" / name).read_bytes()
+
+def test_prune_keeps_mods_that_failed_to_resolve(installer, server, tmp_path, monkeypatch):
+    mods = tmp_path / "mods"
+    installer.install_mods(["mod-0", "mod-1"], LOADER, GAME_VERSION, mods)
+    installer.memo.clear()
+    
+    # The mod-1 project lookup fails once, as a flaky network would
+    get_json = installer.get_json
+    failed = []
+    
+    def flaky_get_json(url, params=None):
+        if url.endswith("/project/" + installer.slug_index.id_for("mod-1")) and not failed:
+            failed.append(url)
+            raise requests.exceptions.ConnectionError("connection reset")
+        return get_json(url, params)
+    
+    monkeypatch.setattr(installer, 'get_json', flaky_get_json)
+    results, plan = installer.sync_mods(["mod-0", "mod-1"], LOADER, GAME_VERSION, mods, prune=True)
+    
+    assert failed and results["mod-1"] is False
+    assert not plan['complete']
+    assert [item['reason'] for item in plan['remove']] == ['unwanted']
+    assert sorted(path.name.rsplit("-", 1)[0] for path in mods.glob("*.jar")) == ["lib-0", "mod-0", "mod-1"]